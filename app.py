@@ -1,27 +1,44 @@
 import cv2
-import mediapipe as mp
-import math
 import random
 import time
-import os
-import numpy as np
+import argparse
 from src.DataManager import DataManager
-from src.Components import Button, VirtualKeyboard
+from src.Components import Button, VirtualKeyboard, LABELS
+from src.Capture import open_frame_source
+from src.HandTracking import HandTracker, AsyncHandTracker
+from src.LandmarkLog import LandmarkRecorder, ReplayHandTracker
+from src.Gestures import HandGestures, draw_hand
+from src.Sprites import SpriteCache, blit_sprite
+from src.Assets import AssetManager
+from src.Enemies import CIRCLE, SQUARE, BOSS, KIND_COLORS, KIND_NAMES
+from src.Simulation import GameSimulation
+from src.Profiler import FrameProfiler
+from src.Tracing import Tracer
+from src.Overlay import Overlay
+from src.Scenes import SCENES, FrameInput
 
 # ==========================================
 # 3. MAIN GAME CLASS
 # ==========================================
 class HandGame:
-    def __init__(self):
+    def __init__(self, source="camera", realtime=True, headless=False, max_frames=None,
+                 async_inference=False, inference_scale=1.0, record_landmarks=None, replay_landmarks=None,
+                 asset_pack="src/icons/assets.pack", lockstep=False, profile=False, trace=None):
         # --- Window Setup (Fullscreen) ---
+        # Headless mode runs the whole loop but never opens a window (servers, benchmarks)
         self.window_name = "Hand Game Ultimate"
-        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
-        cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        self.headless = headless
+        self.max_frames = max_frames
+        # Optional timing trace (Chrome trace JSON or CSV) of frame stages, states and game events
+        self.tracer = Tracer(trace) if trace else None
+        if not self.headless:
+            cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+            cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
         # --- Camera Setup ---
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(3, 1280)
-        self.cap.set(4, 720)
+        # Live camera, video file, frame directory or synthetic frames (see open_frame_source).
+        # The camera is read on a worker thread, run() only ever gets the newest frame.
+        self.cap = open_frame_source(source, realtime, 1280, 720)
         
         success, img = self.cap.read()
         if success:
@@ -33,12 +50,21 @@ class HandGame:
         self.center = (self.width // 2, self.height // 2)
         
         # --- MediaPipe Setup ---
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.7)
-        self.mp_draw = mp.solutions.drawing_utils
+        # The async tracker infers frame N+1 on a worker while frame N is simulated and drawn.
+        # A replayed landmark log stands in for MediaPipe entirely (deterministic, no model).
+        if replay_landmarks:
+            self.tracker = ReplayHandTracker(replay_landmarks)
+        else:
+            tracker_cls = AsyncHandTracker if async_inference else HandTracker
+            self.tracker = tracker_cls(max_num_hands=2, min_detection_confidence=0.7,
+                                       inference_scale=inference_scale)
+        self.recorder = LandmarkRecorder(record_landmarks) if record_landmarks else None
+        self.input_latency = 0.0  # age of the landmarks used for the current frame
 
         # --- Data & System ---
         self.db = DataManager()
+        if self.tracer:
+            self.db.on_save = lambda start, end: self.tracer.span("save users.json", start, end, cat="io")
         
         # --- Game State ---
         self.running = True
@@ -55,26 +81,38 @@ class HandGame:
         # ===============================================================
         # [NEW] LOAD SPECIFIC ASSETS
         # ===============================================================
-        self.icons_pinch = self.load_images_from_folder("src/icons/pinch")
-        self.icons_fist = self.load_images_from_folder("src/icons/fist")
-        
-        # Load Default Ship
-        self.img_ship_default = self.load_single_image("src/icons/spaceship/spaceship.png")
-        
-        # Load Special Assets
-        self.img_enemy_special = self.load_single_image("src/icons/special/special_enemy.png")
-        self.img_ship_evolved = self.load_single_image("src/icons/special/special_ship.png")
-
-        # State to track which ship to draw
-        self.current_ship_img = self.img_ship_default 
+        # Every icon set is decoded once here (or mapped from the prebaked asset pack);
+        # evolving/resetting the ship only switches references
+        load_start = time.perf_counter()
+        self.assets = AssetManager("src/icons", asset_pack)
+        if self.tracer:
+            self.tracer.span("load assets", load_start, time.perf_counter(), cat="io",
+                             args={"from_pack": self.assets.from_pack})
+            self.assets.on_change = lambda change: self.tracer.instant("assets " + change)
+        print(f"Loaded assets: {self.assets.nbytes() / 2**20:.1f} MB "
+              f"{'mapped from ' + asset_pack if self.assets.from_pack else 'decoded'}")
+
+        # Resized, premultiplied icons per (icon, diameter), so enemies are not resized every frame
+        self.sprites = SpriteCache(prebaked=self.assets.mips)
 
         # --- UI Initialization ---
         self.init_ui_elements()
 
-        self.enemies = []
-        self.score = 0
-        self.difficulty_settings = {}
-        self.set_difficulty("NORMAL") 
+        # All game rules (spawning, movement, scoring, boss, game over) live in the simulation;
+        # this class feeds it gestures and draws what it reports
+        self.sim = GameSimulation(self.width, self.height, self.assets.icon_counts(), lockstep=lockstep,
+                                  can_evolve=self.assets.can_evolve())
+        self.enemies = self.sim.enemies
+
+        # Translucent UI layer, blended only where something was drawn
+        self.overlay = Overlay()
+
+        # Per-stage frame timings; the HUD is toggled with the P key
+        self.profiler = FrameProfiler(enabled=profile, tracer=self.tracer)
+
+        # One scene per game state (src/Scenes.py); self.scene is the one the current frame runs
+        self.scenes = {name: scene_cls(self) for name, scene_cls in SCENES.items()}
+        self.scene = None
 
     def init_ui_elements(self):
         """Calculates dynamic UI positions based on screen size."""
@@ -139,23 +177,6 @@ class HandGame:
         self.btn_restart = Button("RESTART", (cx - btn_w//2, p_y + step_y), size=btn_size, color=(255, 255, 150))
         self.btn_save_quit = Button("SAVE & QUIT", (cx - btn_w//2, p_y + step_y * 2), size=btn_size, color=(255, 150, 150))
 
-    def load_images_from_folder(self, folder):
-        """Loads all images from a folder into a list."""
-        images = []
-        if not os.path.exists(folder): return []
-        for filename in os.listdir(folder):
-            try:
-                img = cv2.imread(os.path.join(folder, filename), cv2.IMREAD_UNCHANGED)
-                if img is not None: images.append(img)
-            except: pass
-        return images
-
-    def load_single_image(self, path):
-        """Loads a single image safely."""
-        if os.path.exists(path):
-            return cv2.imread(path, cv2.IMREAD_UNCHANGED)
-        return None
-
     def refresh_user_buttons(self):
         users = self.db.get_user_list()
         self.user_buttons = []
@@ -176,508 +197,248 @@ class HandGame:
             if i < 12:
                 self.user_buttons.append(Button(u_name, (x, y), size=(btn_w, btn_h)))
 
-    def set_difficulty(self, level):
-        self.current_difficulty = level 
-        if level == "EASY":
-            self.difficulty_settings = {"spawn_rate": 1.5, "speed_base": 2, "speed_mult": 0.05}
-        elif level == "NORMAL":
-            self.difficulty_settings = {"spawn_rate": 1.0, "speed_base": 4, "speed_mult": 0.1}
-        elif level == "HARD":
-            self.difficulty_settings = {"spawn_rate": 0.6, "speed_base": 6, "speed_mult": 0.2}
-        self.spawn_interval = self.difficulty_settings["spawn_rate"]
-
-    def spawn_enemy(self):
-        side = random.choice(['top', 'bottom', 'left', 'right'])
-        if side == 'top': x, y = random.randint(0, self.width), 0
-        elif side == 'bottom': x, y = random.randint(0, self.width), self.height
-        elif side == 'left': x, y = 0, random.randint(0, self.height)
-        else: x, y = self.width, random.randint(0, self.height)
-        
-        angle = math.atan2(self.center[1] - y, self.center[0] - x)
-        speed = self.difficulty_settings["speed_base"] + (self.score * self.difficulty_settings["speed_mult"])
-        
-        enemy_type = 'circle'
-        enemy_color = (0, 0, 255)
-        icon_img = None
-
-        # =================================================
-        # [NEW] BOSS SPAWN LOGIC
-        # Condition: Hard Mode + Score >= 64 + 90% Chance
-        # =================================================
-        spawned_boss = False
-        
-        if (self.current_difficulty == "NORMAL" or self.current_difficulty == "HARD") and np.log2(self.score) == np.floor(np.log2(self.score)):
-            # chance = 1
-            chance = np.log2(self.score)/50
-            if random.random() < chance: # 90% chance
-                enemy_type = 'boss'
-                enemy_color = (0, 255, 255) # Yellowish fallback
-                icon_img = self.img_enemy_special
-                spawned_boss = True
-                print("DEBUG: BOSS SPAWNED!")
-
-
-        # If not boss, do standard logic
-        if not spawned_boss:
-            # Special "Square" Enemy Logic (Toggle based)
-            is_special_square = False
-            chance = 0.0
-            if self.enable_special_enemies:
-                if self.current_difficulty == "HARD": chance = 0.5 
-                elif self.current_difficulty == "NORMAL": chance = 0.3
-                else: chance = 0.1
-                
-                if random.random() < chance:
-                    is_special_square = True
-                    enemy_type = 'square'
-                    enemy_color = (255, 0, 0)
-
-            # Assign Icon for standard types
-            if is_special_square and self.icons_fist:
-                icon_img = random.choice(self.icons_fist)
-            elif not is_special_square and self.icons_pinch:
-                icon_img = random.choice(self.icons_pinch)
-
-        self.enemies.append({
-            'x': x, 'y': y,
-            'vx': math.cos(angle) * speed,
-            'vy': math.sin(angle) * speed,
-            'radius': int(self.width * 0.04) if enemy_type == 'boss' else int(self.width * 0.035),
-            'color': enemy_color,
-            'type': enemy_type,
-            'icon': icon_img
-        })
+    @property
+    def score(self):
+        return self.sim.score
+
+    def start_game(self, level):
+        """Starts a fresh round on the given difficulty."""
+        self.current_difficulty = level
+        self.sim.start(level, self.enable_special_enemies)
+        self.assets.reset()
+        self.state = "PLAYING"
+
+    def draw_enemies(self, img):
+        enemies = self.enemies
+        x, y = enemies.interpolated(self.sim.clock.alpha)
+        xs, ys = x.astype(int).tolist(), y.astype(int).tolist()
+        for draw_x, draw_y, radius, kind, variant, evolved in zip(xs, ys, enemies.radius.tolist(), enemies.kind.tolist(),
+                                                                 enemies.variant.tolist(), enemies.evolved.tolist()):
+            # Drawn before compositing, so the overlay has to snapshot these tiles first
+            pad = int(radius) + 3
+            self.overlay.protect(draw_x - pad, draw_y - pad, draw_x + pad, draw_y + pad)
+            if variant >= 0:
+                icon = self.assets.enemy_icons(kind, evolved)[variant]
+                self.draw_image_centered(img, icon, draw_x, draw_y, int(radius*2))
+            else:
+                # Fallback shapes
+                r = int(radius)
+                if kind == CIRCLE:
+                    cv2.circle(img, (draw_x, draw_y), r, KIND_COLORS[CIRCLE], -1)
+                elif kind == BOSS:
+                    # Boss fallback if image missing: Big Yellow Circle
+                    cv2.circle(img, (draw_x, draw_y), r, KIND_COLORS[BOSS], -1)
+                    cv2.circle(img, (draw_x, draw_y), r, (255, 255, 255), 4)
+                else:
+                    cv2.rectangle(img, (draw_x-r, draw_y-r), (draw_x+r, draw_y+r), KIND_COLORS[SQUARE], -1)
+                    cv2.rectangle(img, (draw_x-r, draw_y-r), (draw_x+r, draw_y+r), (255, 255, 255), 2)
 
     # [HELPER] Draw transparent PNG
     def draw_image_centered(self, bg_img, icon, x, y, diameter):
         if icon is None: return
         if diameter <= 0: return 
         try:
-            icon_resized = cv2.resize(icon, (diameter, diameter))
-        except: return
+            sprite = self.sprites.get(icon, diameter)
+        except cv2.error: return
+        blit_sprite(bg_img, sprite, x, y)
 
-        h, w, _ = icon_resized.shape
-        y1, y2 = y - h // 2, y + h // 2
-        x1, x2 = x - w // 2, x + w // 2
+    def put_text(self, img, text, org, scale, color, thickness):
+        """cv2.putText (Hershey simplex) for text drawn on the frame before the overlay is blended."""
+        self.overlay.protect_text(text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
 
-        if y1 < 0 or y2 > bg_img.shape[0] or x1 < 0 or x2 > bg_img.shape[1]: return 
-
-        if icon_resized.shape[2] == 4:
-            alpha_s = icon_resized[:, :, 3] / 255.0
-            alpha_l = 1.0 - alpha_s
-            for c in range(0, 3):
-                bg_img[y1:y2, x1:x2, c] = (alpha_s * icon_resized[:, :, c] +
-                                           alpha_l * bg_img[y1:y2, x1:x2, c])
-        else:
-            bg_img[y1:y2, x1:x2] = icon_resized
-
-    def detect_fist_logic(self, img, hand_lms):
-        h, w, _ = img.shape
-        wrist = hand_lms.landmark[0]
-        finger_tips = [8, 12, 16, 20]
-        total_dist = 0
-        for tip_id in finger_tips:
-            tip = hand_lms.landmark[tip_id]
-            dist = math.hypot(tip.x * w - wrist.x * w, tip.y * h - wrist.y * h)
-            total_dist += dist
-        middle_mcp = hand_lms.landmark[9]
-        cx, cy = int(middle_mcp.x * w), int(middle_mcp.y * h)
-        threshold = h * 0.6 
-        is_fist = total_dist < threshold
-        return is_fist, (cx, cy)
-
-    def detect_pinch_logic(self, img, hand_lms, hand_id):
-        h, w, _ = img.shape
-        thumb = hand_lms.landmark[4]
-        index = hand_lms.landmark[8]
-        x4, y4 = int(thumb.x * w), int(thumb.y * h)
-        x8, y8 = int(index.x * w), int(index.y * h)
-        cx, cy = (x4 + x8) // 2, (y4 + y8) // 2
-        length = math.hypot(x8 - x4, y8 - y4)
-
-        is_clicking = False
+    def update_click_state(self, hand_id, is_pinching):
+        """Turns a held pinch into a single click: True only on the frame the pinch starts."""
         state_locked = self.hand_clicked_status.get(hand_id, False)
-
-        if length < self.pinch_threshold:
-            if not state_locked:
-                is_clicking = True
-                self.hand_clicked_status[hand_id] = True
-        else:
-            self.hand_clicked_status[hand_id] = False
-            
-        cursor_data = {
-            "pos": (cx, cy),
-            "p1": (x4, y4),
-            "p2": (x8, y8),
-            "is_pinching": length < self.pinch_threshold
-        }
-        return is_clicking, cursor_data
+        self.hand_clicked_status[hand_id] = is_pinching
+        return is_pinching and not state_locked
+
+    def trace_event(self, event):
+        """Writes a GameSimulation event to the trace."""
+        name = event[0]
+        if name == "SPAWN":
+            self.tracer.instant("boss spawn" if event[1] == BOSS else "spawn", args={"kind": KIND_NAMES[event[1]]})
+        elif name == "HIT":
+            self.tracer.instant("hit", args={"kind": KIND_NAMES[event[1]], "points": event[2]})
+        elif name == "EVOLVED":
+            self.tracer.instant("ship evolved")
+        elif name == "GAME_OVER":
+            self.tracer.instant("game over", args={"score": event[1]})
 
     def run(self):
+        self.frame_count = 0
+        self.total_latency = 0.0
+        start_time = time.perf_counter()
+        try:
+            self.main_loop()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.cap.release()
+            self.tracker.close()
+            if self.recorder: self.recorder.close()
+            if self.tracer: self.tracer.close()
+            if not self.headless:
+                cv2.destroyAllWindows()
+            fps = self.frame_count / elapsed if elapsed > 0 else 0.0
+            print(f"Processed {self.frame_count} frames in {elapsed:.2f}s ({fps:.1f} FPS)")
+            if self.frame_count:
+                print(f"Average input latency: {self.total_latency / self.frame_count * 1000:.1f} ms")
+            print("Capture stats:", self.cap.stats())
+            print("Sprite cache:", self.sprites.stats())
+            print("Label cache:", LABELS.stats())
+            if self.profiler.enabled:
+                print("Frame stages (ms):")
+                for line in self.profiler.report(): print("  " + line)
+
+    def main_loop(self):
+        profiler = self.profiler
         while self.running: 
+            if self.max_frames is not None and self.frame_count >= self.max_frames: break
+            profiler.start()
             success, img = self.cap.read()
             if not success: break
+            profiler.lap("capture")
+
+            scene = self.scenes[self.state]
+            if scene is not self.scene:
+                self.scene = scene
+                scene.enter()
             
             img = cv2.flip(img, 1)
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(img_rgb)
-
+            profiler.lap("flip")
+            self.tracker.submit(img, self.cap.timestamp, self.cap.frame_id)
+            results = self.tracker.collect()
+            profiler.lap("tracking")
+            if results is None: continue  # pipeline still filling up
+
+            # Simulate and draw the frame the landmarks were detected in
+            img = results.frame
+            self.input_latency = results.age()
+            self.total_latency += self.input_latency
+            self.frame_count += 1
+            if self.recorder:
+                self.recorder.write(results.timestamp, results.hands)
+
+            # Evaluate every hand once, the result is reused for drawing the cursors
+            gestures = HandGestures(results.hands, img.shape[1], img.shape[0], self.pinch_threshold,
+                                    detect_fists=scene.needs_fists)
             all_clicks = []      
-            all_cursors_data = [] 
-            cursor_positions = [] 
+            cursor_positions = gestures.cursors
             all_fists = [] 
-            
-            if results.multi_hand_landmarks:
-                for idx, hand_lms in enumerate(results.multi_hand_landmarks):
-                    clicked, cursor_data = self.detect_pinch_logic(img, hand_lms, idx)
-                    all_cursors_data.append((hand_lms, cursor_data))
-                    cursor_positions.append(cursor_data["pos"])
-                    if clicked:
-                        all_clicks.append(cursor_data["pos"])
-                    
-                    is_fist, fist_pos = self.detect_fist_logic(img, hand_lms)
-                    if is_fist:
-                        all_fists.append(fist_pos)
-
-            overlay = img.copy()
-
-            # --- STATE LOGIC ---
-            if self.state == "LOGIN":
-                cv2.putText(img, "PLEASE ENTER NAME", (int(self.width*0.3), int(self.height*0.10)), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,0), 2)
-                self.keyboard.draw(img, overlay, cursor_positions) 
-                self.btn_skip.draw_on_overlay(overlay, any(self.btn_skip.is_hovering(*c) for c in cursor_positions))
-
-                for click_pos in all_clicks:
-                    res = self.keyboard.handle_click(click_pos)
-                    if res == "ENTER_PRESSED":
-                        self.next_state_after_confirm = "LOGIN_SUCCESS"
-                        self.state = "CONFIRM_ACTION"
-                    if self.btn_skip.is_hovering(*click_pos):
-                        self.current_user = "Guest"
-                        self.is_guest = True
-                        self.state = "MENU"
-
-            elif self.state == "ADD_USER_INPUT":
-                cv2.putText(img, "CREATE NEW USER", (int(self.width*0.3), int(self.height*0.15)), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,0), 2)
-                self.keyboard.draw(img, overlay, cursor_positions)
-                self.btn_back_to_record_kb.draw_on_overlay(overlay, any(self.btn_back_to_record_kb.is_hovering(*c) for c in cursor_positions))
-
-                for click_pos in all_clicks:
-                    res = self.keyboard.handle_click(click_pos)
-                    if res == "ENTER_PRESSED":
-                        self.next_state_after_confirm = "ADD_SUCCESS"
-                        self.state = "CONFIRM_ACTION"
-                    if self.btn_back_to_record_kb.is_hovering(*click_pos):
-                        self.state = "RECORDS"
-
-            elif self.state == "CONFIRM_ACTION":
-                box_x1, box_x2 = int(self.width * 0.25), int(self.width * 0.75)
-                box_y1, box_y2 = int(self.height * 0.3), int(self.height * 0.7)
-                cv2.rectangle(overlay, (box_x1, box_y1), (box_x2, box_y2), (255, 255, 255), -1)
-                cv2.putText(img, f"Confirm: '{self.keyboard.input_text}'?", (box_x1 + 20, box_y1 + 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,0), 2)
-
-                for btn in [self.btn_confirm_yes, self.btn_confirm_no]:
-                    is_hover = any(btn.is_hovering(*c) for c in cursor_positions)
-                    btn.draw_on_overlay(overlay, is_hover)
-
-                for click_pos in all_clicks:
-                    if self.btn_confirm_yes.is_hovering(*click_pos):
-                        self.current_user = self.keyboard.input_text
-                        self.is_guest = False
-                        self.db.register_user(self.current_user)
-                        if self.next_state_after_confirm == "LOGIN_SUCCESS": self.state = "MENU"
-                        elif self.next_state_after_confirm == "ADD_SUCCESS": self.state = "RECORDS"
-                    elif self.btn_confirm_no.is_hovering(*click_pos):
-                        if self.next_state_after_confirm == "LOGIN_SUCCESS": self.state = "LOGIN"
-                        elif self.next_state_after_confirm == "ADD_SUCCESS": self.state = "ADD_USER_INPUT"
-
-            elif self.state == "CONFIRM_DELETE":
-                box_x1, box_x2 = int(self.width * 0.2), int(self.width * 0.8)
-                box_y1, box_y2 = int(self.height * 0.3), int(self.height * 0.7)
-                cv2.rectangle(overlay, (box_x1, box_y1), (box_x2, box_y2), (200, 200, 255), -1)
-                cv2.putText(img, "ARE YOU SURE?", (box_x1 + 50, box_y1 + 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0,0,0), 2)
-
-                for btn in [self.btn_delete_yes, self.btn_delete_no]:
-                    is_hover = any(btn.is_hovering(*c) for c in cursor_positions)
-                    btn.draw_on_overlay(overlay, is_hover)
-                for click_pos in all_clicks:
-                    if self.btn_delete_yes.is_hovering(*click_pos):
-                        self.db.delete_user(self.current_user)
-                        self.keyboard.input_text = ""
-                        self.state = "LOGIN" 
-                    elif self.btn_delete_no.is_hovering(*click_pos):
-                        self.state = "RECORDS" 
-
-            elif self.state == "MENU":
-                display_name = "Guest" if self.is_guest else self.current_user
-                cv2.putText(img, f"Welcome, {display_name}", (int(self.width*0.05), int(self.height*0.1)), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,0), 2)
-                
-                # [MODIFIED] Removed "CHANGE SHIP" button
-                for btn in [self.btn_start, self.btn_records, self.btn_exit]:
-                    is_hover = any(btn.is_hovering(*c) for c in cursor_positions)
-                    btn.draw_on_overlay(overlay, is_hover) 
-                
-                for click_pos in all_clicks:
-                    if self.btn_start.is_hovering(*click_pos): self.state = "DIFFICULTY"
-                    elif self.btn_records.is_hovering(*click_pos): self.state = "RECORDS"
-                    elif self.btn_exit.is_hovering(*click_pos): self.running = False
-
-            elif self.state == "DIFFICULTY":
-                cv2.putText(img, "SELECT DIFFICULTY", (int(self.width * 0.35), int(self.height*0.2)), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0,0,0), 2)
-                self.btn_special_toggle.text = f"SPECIAL: {'ON' if self.enable_special_enemies else 'OFF'}"
-                self.btn_special_toggle.color = (150, 255, 150) if self.enable_special_enemies else (200, 200, 200)
-
-                buttons = [self.btn_easy, self.btn_med, self.btn_hard, self.btn_back, self.btn_special_toggle]
-                for btn in buttons:
-                    is_hover = any(btn.is_hovering(*c) for c in cursor_positions)
-                    btn.draw_on_overlay(overlay, is_hover)
-                
-                for click_pos in all_clicks:
-                    if self.btn_easy.is_hovering(*click_pos):
-                        self.set_difficulty("EASY")
-                        self.state = "PLAYING"
-                        self.current_ship_img = self.img_ship_default # Reset Ship
-                    elif self.btn_med.is_hovering(*click_pos):
-                        self.set_difficulty("NORMAL")
-                        self.state = "PLAYING"
-                        self.current_ship_img = self.img_ship_default # Reset Ship
-                    elif self.btn_hard.is_hovering(*click_pos):
-                        self.set_difficulty("HARD")
-                        self.state = "PLAYING"
-                        self.current_ship_img = self.img_ship_default # Reset Ship
-                    elif self.btn_back.is_hovering(*click_pos):
-                        self.state = "MENU"
-                    elif self.btn_special_toggle.is_hovering(*click_pos):
-                        self.enable_special_enemies = not self.enable_special_enemies
-                    
-                    if self.state == "PLAYING":
-                        self.enemies = []
-                        self.score = 0
-                        self.last_spawn_time = time.time()
-
-            elif self.state == "PLAYING":
-                # [NEW] Draw Current Player Ship (Default or Evolved)
-                if self.current_ship_img is not None:
-                    self.draw_image_centered(img, self.current_ship_img, self.center[0], self.center[1], 80)
-                else:
-                    cv2.circle(img, self.center, 30, (0, 255, 0), -1)
 
-                cv2.putText(img, f"Score: {self.score}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 0), 2)
-                cv2.putText(img, f"Diff: {self.current_difficulty}", (50, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
-                if self.is_guest:
-                     cv2.putText(img, "GUEST MODE", (50, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (100, 100, 255), 2)
-
-                is_hover_pause = any(self.btn_pause.is_hovering(*c) for c in cursor_positions)
-                self.btn_pause.draw_on_overlay(overlay, is_hover_pause)
-
-                for click_pos in all_clicks:
-                    if self.btn_pause.is_hovering(*click_pos):
-                        self.state = "PAUSED"
-
-                if time.time() - self.last_spawn_time > self.spawn_interval:
-                    self.spawn_enemy()
-                    self.last_spawn_time = time.time()
-                
-                for enemy in self.enemies[:]:
-                    enemy['x'] += enemy['vx']
-                    enemy['y'] += enemy['vy']
-                    
-                    hit_enemy = False
-                    
-                    # 1. Circle Enemy -> Pinch
-                    if enemy['type'] == 'circle':
-                        for click_pos in all_clicks:
-                            if math.hypot(enemy['x'] - click_pos[0], enemy['y'] - click_pos[1]) < (enemy['radius'] + 30):
-                                self.enemies.remove(enemy)
-                                self.score += 1
-                                hit_enemy = True
-                                break 
-                    
-                    # 2. Square/Boss Enemy -> Fist
-                    elif enemy['type'] == 'square' or enemy['type'] == 'boss':
-                        for fist_pos in all_fists:
-                             if math.hypot(enemy['x'] - fist_pos[0], enemy['y'] - fist_pos[1]) < (enemy['radius'] + 40): 
-                                
-                                # [NEW] Boss Transformation Logic
-                                if enemy['type'] == 'boss':
-                                    self.score += 10
-                                    # Transform Ship!
-                                    if self.img_ship_evolved is not None:
-                                        self.icons_pinch = self.load_images_from_folder("src/icons/special_pinch")
-                                        self.icons_fist = self.load_images_from_folder("src/icons/special_fist")
-                                        self.current_ship_img = self.img_ship_evolved
-                                    print("BOSS DEFEATED! SHIP EVOLVED!")
-                                else:
-                                    self.score += 2
-                                    
-                                self.enemies.remove(enemy)
-                                hit_enemy = True
-                                break
-
-                    if hit_enemy: continue
-
-                    if math.hypot(enemy['x'] - self.center[0], enemy['y'] - self.center[1]) < 40:
-                        self.state = "GAME_OVER"
-                        if not self.is_guest:
-                            self.db.add_score(self.current_user, self.score, self.current_difficulty)
-                    
-                    draw_x, draw_y = int(enemy['x']), int(enemy['y'])
-                    
-                    if enemy.get('icon') is not None:
-                        self.draw_image_centered(img, enemy['icon'], draw_x, draw_y, int(enemy['radius']*2))
-                    else:
-                        # Fallback shapes
-                        if enemy['type'] == 'circle':
-                            cv2.circle(img, (draw_x, draw_y), int(enemy['radius']), enemy['color'], -1)
-                        elif enemy['type'] == 'boss':
-                            # Boss fallback if image missing: Big Yellow Circle
-                            cv2.circle(img, (draw_x, draw_y), int(enemy['radius']), (0, 255, 255), -1)
-                            cv2.circle(img, (draw_x, draw_y), int(enemy['radius']), (255, 255, 255), 4)
-                        else:
-                            r = int(enemy['radius'])
-                            cv2.rectangle(img, (draw_x-r, draw_y-r), (draw_x+r, draw_y+r), enemy['color'], -1)
-                            cv2.rectangle(img, (draw_x-r, draw_y-r), (draw_x+r, draw_y+r), (255, 255, 255), 2)
-
-            elif self.state == "PAUSED":
-                bx1, bx2 = int(self.width*0.3), int(self.width*0.7)
-                by1, by2 = int(self.height*0.2), int(self.height*0.8)
-                cv2.rectangle(overlay, (bx1, by1), (bx2, by2), (200, 200, 200), -1)
-                cv2.putText(img, "PAUSED", (bx1 + 100, by1 + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0,0,0), 3)
-                
-                buttons = [self.btn_resume, self.btn_restart, self.btn_save_quit]
-                for btn in buttons:
-                    is_hover = any(btn.is_hovering(*c) for c in cursor_positions)
-                    btn.draw_on_overlay(overlay, is_hover)
-                for click_pos in all_clicks:
-                    if self.btn_resume.is_hovering(*click_pos): self.state = "PLAYING"
-                    elif self.btn_restart.is_hovering(*click_pos):
-                        self.enemies = []
-                        self.score = 0
-                        self.last_spawn_time = time.time()
-                        self.state = "PLAYING"
-                        self.current_ship_img = self.img_ship_default # Reset Ship
-                    elif self.btn_save_quit.is_hovering(*click_pos):
-                        if not self.is_guest: self.db.add_score(self.current_user, self.score, self.current_difficulty)
-                        self.state = "MENU"
-
-            elif self.state == "GAME_OVER":
-                self.icons_pinch = self.load_images_from_folder("src/icons/pinch")
-                self.icons_fist = self.load_images_from_folder("src/icons/fist")
-
-                cv2.rectangle(overlay, (0,0), (self.width, self.height), (0,0,0), -1)
-                cv2.putText(img, "GAME OVER", (int(self.width*0.35), int(self.height*0.4)), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 4)
-                cv2.putText(img, f"Final Score: {self.score}", (int(self.width*0.4), int(self.height*0.5)), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-                self.btn_back.draw_on_overlay(overlay, any(self.btn_back.is_hovering(*c) for c in cursor_positions))
-                for click_pos in all_clicks:
-                    if self.btn_back.is_hovering(*click_pos): self.state = "MENU"
-
-            elif self.state == "RECORDS":
-                cv2.rectangle(overlay, (100, 100), (self.width - 100, self.height - 50), (240, 240, 240), -1)
-                cv2.putText(img, "PLAYER RECORDS", (int(self.width*0.35), 120), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (50, 50, 50), 3)
-                if self.is_guest:
-                    cv2.putText(img, "Guest User - No Records", (int(self.width*0.3), 300), cv2.FONT_HERSHEY_SIMPLEX, 1, (100,100,100), 2)
-                    buttons_to_draw = [self.btn_back_rec, self.btn_switch_user, self.btn_add_user]
-                else:
-                    user_data = self.db.data.get(self.current_user, {})
-                    y_offset = 200
-                    cv2.putText(img, f"User: {self.current_user}", (150, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,0), 2)
-                    y_offset += 50
-                    for diff in ["EASY", "NORMAL", "HARD"]:
-                        d_data = user_data.get(diff, {"best_score": 0, "history": []})
-                        text = f"{diff} - Best: {d_data['best_score']} | Games: {len(d_data['history'])}"
-                        cv2.putText(img, text, (150, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,100,0), 2)
-                        y_offset += 40
-                    buttons_to_draw = [self.btn_back_rec, self.btn_delete_user, self.btn_switch_user, self.btn_add_user]
-                for btn in buttons_to_draw:
-                    btn.draw_on_overlay(overlay, any(btn.is_hovering(*c) for c in cursor_positions))
-                for click_pos in all_clicks:
-                    if self.btn_back_rec.is_hovering(*click_pos): self.state = "MENU"
-                    elif not self.is_guest and self.btn_delete_user.is_hovering(*click_pos): self.state = "CONFIRM_DELETE" 
-                    elif self.btn_switch_user.is_hovering(*click_pos):
-                        self.refresh_user_buttons()
-                        self.state = "SWITCH_USER_SELECT"
-                    elif self.btn_add_user.is_hovering(*click_pos):
-                        self.keyboard.input_text = ""
-                        self.state = "ADD_USER_INPUT"
-
-            elif self.state == "SWITCH_USER_SELECT":
-                cv2.rectangle(overlay, (50, 50), (self.width-50, self.height-50), (240, 240, 240), -1)
-                cv2.putText(img, "SELECT USER", (int(self.width*0.4), 100), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0,0,0), 3)
-                for btn in self.user_buttons:
-                    btn.draw_on_overlay(overlay, any(btn.is_hovering(*c) for c in cursor_positions))
-                self.btn_back_from_switch.draw_on_overlay(overlay, any(self.btn_back_from_switch.is_hovering(*c) for c in cursor_positions))
-                for click_pos in all_clicks:
-                    for btn in self.user_buttons:
-                        if btn.is_hovering(*click_pos):
-                            self.current_user = btn.text
-                            self.is_guest = False
-                            self.state = "MENU" 
-                            break
-                    if self.btn_back_from_switch.is_hovering(*click_pos): self.state = "RECORDS"
+            # The button under every cursor, looked up once and shared by the hover fills and the clicks
+            hovered = scene.ui_layer().hit_test(cursor_positions)
+            clicked = []
+            
+            for idx in range(gestures.count):
+                if self.update_click_state(idx, gestures.is_pinching[idx]):
+                    all_clicks.append(gestures.cursors[idx])
+                    clicked.append(hovered[idx])
+                if gestures.is_fist[idx]:
+                    all_fists.append(gestures.fist_pos[idx])
+            profiler.lap("gestures")
+
+            # --- STATE LOGIC AND DRAWING ---
+            # The whole frame belongs to the scene it started in, even if update() switches state
+            overlay = self.overlay
+            overlay.begin(img, full=scene.full_overlay)
+            frame = FrameInput(img, overlay, cursor_positions, all_clicks, all_fists, hovered, clicked)
+            stage = scene.name.lower()
+            scene.update(frame)
+            if self.tracer: self.tracer.mark_state(self.state)
+            profiler.lap(stage + ".update")
+            scene.draw_overlay(frame)
+            profiler.lap(stage + ".overlay")
+            if scene.has_sprites:
+                scene.draw_sprites(frame)
+                profiler.lap(stage + ".sprites")
 
             # --- STEP 3: COMPOSITING ---
-            alpha = 0.3 
-            if self.state == "GAME_OVER": alpha = 0.6
-            elif self.state == "PAUSED": alpha = 0.4 
-            cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+            overlay.composite(scene.alpha)
+            profiler.lap("composite")
 
             # --- STEP 4: DRAW TEXT LAYERS ---
-            if self.state == "LOGIN": 
-                self.keyboard.draw_text(img)
-                self.btn_skip.draw_text_and_border(img)
-            elif self.state == "ADD_USER_INPUT":
-                self.keyboard.draw_text(img)
-                self.btn_back_to_record_kb.draw_text_and_border(img)
-            elif self.state == "CONFIRM_ACTION":
-                self.btn_confirm_yes.draw_text_and_border(img)
-                self.btn_confirm_no.draw_text_and_border(img)
-            elif self.state == "CONFIRM_DELETE":
-                self.btn_delete_yes.draw_text_and_border(img)
-                self.btn_delete_no.draw_text_and_border(img)
-            elif self.state == "MENU": 
-                # [MODIFIED] Removed "Change Ship"
-                for btn in [self.btn_start, self.btn_records, self.btn_exit]: btn.draw_text_and_border(img)
-            elif self.state == "DIFFICULTY":
-                for btn in [self.btn_easy, self.btn_med, self.btn_hard, self.btn_back, self.btn_special_toggle]: btn.draw_text_and_border(img)
-            elif self.state == "PLAYING":
-                self.btn_pause.draw_text_and_border(img)
-            elif self.state == "PAUSED":
-                for btn in [self.btn_resume, self.btn_restart, self.btn_save_quit]: btn.draw_text_and_border(img)
-            elif self.state == "GAME_OVER":
-                self.btn_back.draw_text_and_border(img)
-            elif self.state == "RECORDS":
-                self.btn_back_rec.draw_text_and_border(img)
-                self.btn_switch_user.draw_text_and_border(img)
-                self.btn_add_user.draw_text_and_border(img)
-                if not self.is_guest:
-                    self.btn_delete_user.draw_text_and_border(img)
-            elif self.state == "SWITCH_USER_SELECT":
-                for btn in self.user_buttons: btn.draw_text_and_border(img)
-                self.btn_back_from_switch.draw_text_and_border(img)
+            # Borders and labels of the scene's buttons, pasted from its cached layer
+            scene.draw_text(frame)
+            profiler.lap(stage + ".text")
 
             # --- STEP 5: DRAW CURSORS ---
-            for hand_lms, c_data in all_cursors_data:
-                self.mp_draw.draw_landmarks(img, hand_lms, self.mp_hands.HAND_CONNECTIONS)
+            for idx in range(gestures.count):
+                draw_hand(img, gestures.landmarks[idx])
                 
-                cv2.line(img, c_data["p1"], c_data["p2"], (255, 0, 255), 2)
-                cx, cy = c_data["pos"]
+                cv2.line(img, gestures.p1[idx], gestures.p2[idx], (255, 0, 255), 2)
+                cx, cy = gestures.cursors[idx]
                 
-                is_fist, fist_pos = self.detect_fist_logic(img, hand_lms)
-                if is_fist:
+                if gestures.is_fist[idx]:
+                    fist_pos = gestures.fist_pos[idx]
                     cv2.circle(img, fist_pos, 50, (255, 0, 0), 4)
                     cv2.putText(img, "FIST MODE", (fist_pos[0]-60, fist_pos[1]-70), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
 
-                if c_data["is_pinching"]:
+                if gestures.is_pinching[idx]:
                     cv2.circle(img, (cx, cy), 15, (0, 255, 0), -1) 
                 else:
                     cv2.circle(img, (cx, cy), 15, (0, 0, 255), 2)  
 
-            cv2.imshow(self.window_name, img)
-            if cv2.waitKey(1) & 0xFF == 27: break
-
-        self.cap.release()
-        cv2.destroyAllWindows()
+            profiler.lap("landmarks")
+
+            # --- STEP 6: PRESENT ---
+            profiler.draw(img)
+            if not self.headless:
+                cv2.imshow(self.window_name, img)
+                key = cv2.waitKey(1) & 0xFF
+                if key == 27: break
+                elif key in (ord('p'), ord('P')): profiler.toggle()
+            profiler.lap("present")
+            if self.tracer:
+                # How much of the frame the overlay blend touched, next to the frame's timings
+                profiler.finish(frame=self.frame_count, state=self.state,
+                                overlay_dirty=round(self.overlay.dirty_fraction(), 3))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hand Game Ultimate: AR Space Defender")
+    parser.add_argument("--source", default="camera",
+                        help="camera[:INDEX], video:PATH, images:DIR or synthetic[:FRAMES]")
+    parser.add_argument("--fast", action="store_true",
+                        help="play recorded sources as fast as possible instead of at native speed")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the full game loop without any window and report FPS on exit")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="stop after this many frames")
+    parser.add_argument("--async-inference", action="store_true",
+                        help="run hand tracking on a worker thread, pipelined with rendering")
+    parser.add_argument("--inference-scale", type=float, default=1.0,
+                        help="downscale frames by this factor before hand tracking (e.g. 0.5)")
+    parser.add_argument("--record-landmarks", metavar="PATH", default=None,
+                        help="write the detected hand landmarks of every frame to a log file")
+    parser.add_argument("--replay-landmarks", metavar="PATH", default=None,
+                        help="use a recorded landmark log instead of running MediaPipe")
+    parser.add_argument("--asset-pack", default="src/icons/assets.pack",
+                        help="prebaked asset pack to map at startup (build with python -m src.AssetPack)")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="advance the simulation exactly one tick per frame (deterministic replays)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the random enemy spawns, for reproducible runs")
+    parser.add_argument("--profile", action="store_true",
+                        help="show per-stage frame timings (toggle in game with P)")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help="write frame stage timings and game events to a Chrome trace (.json) or CSV file")
+    parser.add_argument("--play", choices=["EASY", "NORMAL", "HARD"], default=None,
+                        help="skip the menus and start a guest game on this difficulty")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    game = HandGame()
+    args = parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    game = HandGame(source=args.source, realtime=not args.fast,
+                    headless=args.headless, max_frames=args.max_frames,
+                    async_inference=args.async_inference, inference_scale=args.inference_scale,
+                    record_landmarks=args.record_landmarks, replay_landmarks=args.replay_landmarks,
+                    asset_pack=args.asset_pack, lockstep=args.lockstep, profile=args.profile, trace=args.trace)
+    if args.play:
+        game.current_user = "Guest"
+        game.is_guest = True
+        game.start_game(args.play)
     game.run()
\ No newline at end of file
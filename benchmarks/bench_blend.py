@@ -0,0 +1,60 @@
+"""Microbenchmark for sprite compositing.
+
+Compares the original per-call resize + float64 blend with the cached integer
+kernel in src/Sprites.py for 10, 100 and 1000 sprites on one frame:
+
+    python -m benchmarks.bench_blend
+"""
+import argparse
+import cv2
+import numpy as np
+from benchmarks.common import measure, synthetic_frame, synthetic_icon
+from src.Sprites import SpriteCache, blit_sprite
+
+def legacy_draw_image_centered(bg_img, icon, x, y, diameter):
+    """draw_image_centered as it was before the sprite cache."""
+    icon_resized = cv2.resize(icon, (diameter, diameter))
+    h, w, _ = icon_resized.shape
+    y1, y2 = y - h // 2, y + h // 2
+    x1, x2 = x - w // 2, x + w // 2
+    if y1 < 0 or y2 > bg_img.shape[0] or x1 < 0 or x2 > bg_img.shape[1]: return
+    alpha_s = icon_resized[:, :, 3] / 255.0
+    alpha_l = 1.0 - alpha_s
+    for c in range(0, 3):
+        bg_img[y1:y2, x1:x2, c] = (alpha_s * icon_resized[:, :, c] +
+                                   alpha_l * bg_img[y1:y2, x1:x2, c])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.width, args.height)
+    icon = synthetic_icon()
+    diameter = int(args.width * 0.035) * 2
+    rng = np.random.default_rng(0)
+    cache = SpriteCache()
+
+    print(f"{'sprites':>8} {'legacy ms':>10} {'kernel ms':>10} {'speedup':>8}")
+    for count in args.counts:
+        xs = rng.integers(diameter, args.width - diameter, count).tolist()
+        ys = rng.integers(diameter, args.height - diameter, count).tolist()
+        img = frame.copy()
+
+        def legacy():
+            for x, y in zip(xs, ys):
+                legacy_draw_image_centered(img, icon, x, y, diameter)
+
+        def kernel():
+            for x, y in zip(xs, ys):
+                blit_sprite(img, cache.get(icon, diameter), x, y)
+
+        repeat = max(3, 2000 // count)
+        legacy_ms, _ = measure(legacy, repeat)
+        kernel_ms, _ = measure(kernel, repeat)
+        print(f"{count:>8} {legacy_ms:>10.2f} {kernel_ms:>10.2f} {legacy_ms / kernel_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
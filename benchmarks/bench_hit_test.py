@@ -0,0 +1,59 @@
+"""Stress benchmark for pointer-vs-enemy hit testing in dense swarms.
+
+Compares the original per-dict Python loop, the vectorized brute-force test and
+the spatial hash grid (including its per-tick rebuild):
+
+    python -m benchmarks.bench_hit_test --counts 100 1000 5000 20000 --pointers 4
+"""
+import argparse
+import math
+import numpy as np
+from benchmarks.common import measure
+from src.Enemies import EnemyStore, CIRCLE
+
+def legacy_hits(enemies, points, margin):
+    """The hit test as it was when enemies were a list of dicts."""
+    hit = []
+    for enemy in enemies:
+        for px, py in points:
+            if math.hypot(enemy['x'] - px, enemy['y'] - py) < (enemy['radius'] + margin):
+                hit.append(enemy)
+                break
+    return hit
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--pointers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    radius = int(args.width * 0.035)
+    cell = int(args.width * 0.04) + 40
+    print(f"{'enemies':>8} {'legacy ms':>10} {'brute ms':>9} {'grid ms':>8} {'vs legacy':>10} {'vs brute':>9}")
+    for count in args.counts:
+        store = EnemyStore(cell_size=cell)
+        xs = rng.uniform(0, args.width, count)
+        ys = rng.uniform(0, args.height, count)
+        for x, y in zip(xs, ys):
+            store.add(x, y, 0.0, 0.0, radius, CIRCLE)
+        dicts = [{'x': x, 'y': y, 'radius': radius} for x, y in zip(xs, ys)]
+        points = [(float(rng.uniform(0, args.width)), float(rng.uniform(0, args.height)))
+                  for _ in range(args.pointers)]
+
+        def grid():
+            store.grid_dirty = True  # include the per-tick rebuild
+            store.hits_grid(points, 30)
+
+        assert (store.hits_bruteforce(points, 30) == store.hits_grid(points, 30)).all()
+        repeat = max(5, 20000 // count)
+        legacy_ms, _ = measure(lambda: legacy_hits(dicts, points, 30), max(3, repeat // 10))
+        brute_ms, _ = measure(lambda: store.hits_bruteforce(points, 30), repeat)
+        grid_ms, _ = measure(grid, repeat)
+        print(f"{count:>8} {legacy_ms:>10.3f} {brute_ms:>9.3f} {grid_ms:>8.3f} "
+              f"{legacy_ms / grid_ms:>9.1f}x {brute_ms / grid_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Latency vs. accuracy of hand tracking at reduced inference resolutions.
+
+Runs MediaPipe Hands over the same recorded footage once per scale and compares
+every scale against the full-resolution run:
+
+    python -m benchmarks.bench_inference_scale --source video:recording.mp4 --scales 1.0 0.75 0.5 0.35
+
+Accuracy is reported as the share of frames where the number of detected hands
+matches the full-resolution run, and the mean landmark error in full-frame pixels
+over the hands both runs found.
+"""
+import argparse
+import time
+import cv2
+import numpy as np
+from src.Capture import open_frame_source
+from src.HandTracking import HandTracker
+
+def load_frames(spec, max_frames):
+    source = open_frame_source(spec, realtime=False)
+    frames = []
+    while len(frames) < max_frames:
+        success, img = source.read()
+        if not success: break
+        frames.append(cv2.flip(img, 1))
+    source.release()
+    return frames
+
+def to_pixels(hands, w, h):
+    """Converts a (hands, 21, 3) landmark array into one (21, 2) pixel array per hand."""
+    return [pts[:, :2] * np.float32((w, h)) for pts in hands]
+
+def run_scale(frames, scale):
+    tracker = HandTracker(inference_scale=scale)
+    h, w = frames[0].shape[:2]
+    latencies, outputs = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        landmarks = tracker.infer(frame)
+        latencies.append(time.perf_counter() - start)
+        outputs.append(to_pixels(landmarks, w, h))
+    tracker.close()
+    return np.array(latencies) * 1000, outputs
+
+def compare(reference, outputs):
+    """Returns (hand-count agreement, mean landmark error in px) against the reference run."""
+    agree = 0
+    errors = []
+    for ref_hands, hands in zip(reference, outputs):
+        if len(ref_hands) == len(hands): agree += 1
+        for ref in ref_hands:
+            if not hands: break
+            # Match each reference hand to the closest hand by wrist position
+            best = min(hands, key=lambda pts: np.linalg.norm(pts[0] - ref[0]))
+            errors.append(np.linalg.norm(best - ref, axis=1).mean())
+    mean_err = float(np.mean(errors)) if errors else float("nan")
+    return agree / max(1, len(reference)), mean_err
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", required=True, help="recorded footage, e.g. video:PATH or images:DIR")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.35, 0.25])
+    parser.add_argument("--max-frames", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.max_frames)
+    if not frames:
+        raise SystemExit(f"No frames read from {args.source}")
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {w}x{h}")
+
+    _, reference = run_scale(frames, 1.0)
+    print(f"{'scale':>6} {'input':>10} {'p50 ms':>8} {'p95 ms':>8} {'agree':>7} {'err px':>8}")
+    for scale in args.scales:
+        latencies, outputs = run_scale(frames, scale)
+        agreement, err = compare(reference, outputs)
+        size = f"{int(w * scale)}x{int(h * scale)}"
+        print(f"{scale:>6.2f} {size:>10} {np.percentile(latencies, 50):>8.2f} "
+              f"{np.percentile(latencies, 95):>8.2f} {agreement:>7.1%} {err:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Microbenchmarks for the rendering and UI hot paths, with a saved baseline.
+
+Times the per-frame drawing work on synthetic frames at several resolutions
+(and enemy counts where it matters): sprite blits as done by
+draw_image_centered, Button and VirtualKeyboard drawing, UI hit testing,
+spawn_enemy and the overlay composite step.
+
+    python -m benchmarks.bench_render --save        # record a baseline
+    python -m benchmarks.bench_render               # compare against it
+
+Medians more than --tolerance slower than the baseline are flagged and make the
+run exit with status 1. Baselines are per machine and ignored by git.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import cv2
+import numpy as np
+from benchmarks.common import measure, synthetic_frame, synthetic_icon
+from src.Components import Button, VirtualKeyboard, UILayer
+from src.Enemies import CIRCLE, SQUARE, BOSS
+from src.Overlay import Overlay
+from src.Simulation import GameSimulation
+from src.Sprites import SpriteCache, blit_sprite
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "render_baseline.json")
+RESOLUTIONS = [(640, 360), (1280, 720), (1920, 1080)]
+ENEMY_COUNTS = [10, 100, 1000]
+
+def menu_buttons(width, height):
+    """The five buttons of the difficulty screen, laid out like HandGame.init_ui_elements."""
+    btn_w, btn_h = int(width * 0.2), int(height * 0.08)
+    gap = int(width * 0.05)
+    start_x = (width - (3 * btn_w + 2 * gap)) // 2
+    y = int(height * 0.4)
+    buttons = [Button(text, (start_x + i * (btn_w + gap), y), size=(btn_w, btn_h))
+               for i, text in enumerate(["EASY", "NORMAL", "HARD"])]
+    buttons.append(Button("SPECIAL: OFF", (width // 2 - btn_w // 2, y + int(height * 0.12)), size=(btn_w, btn_h)))
+    buttons.append(Button("BACK", (width // 2 - btn_w // 2, height - btn_h - 30), size=(btn_w, btn_h)))
+    return buttons
+
+def sprite_case(frame, count):
+    """draw_image_centered for count enemies: cached sprite lookup plus blend."""
+    height, width = frame.shape[:2]
+    icons = [synthetic_icon(seed=i) for i in range(3)]
+    diameter = int(width * 0.035) * 2
+    cache = SpriteCache()
+    rng = np.random.default_rng(0)
+    xs = rng.integers(0, width, count).tolist()
+    ys = rng.integers(0, height, count).tolist()
+    img = frame.copy()
+
+    def run():
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            blit_sprite(img, cache.get(icons[i % 3], diameter), x, y)
+    return run
+
+def spawn_case(frame, count):
+    """count spawn_enemy calls into an empty store."""
+    height, width = frame.shape[:2]
+    counts = {(kind, evolved): 3 for kind in (CIRCLE, SQUARE, BOSS) for evolved in (False, True)}
+    sim = GameSimulation(width, height, counts, rng=random.Random(0))
+    sim.start("HARD", special_enemies=True)
+
+    def run():
+        sim.enemies.clear()
+        for _ in range(count):
+            sim.spawn_enemy()
+    return run
+
+def button_overlay_case(frame):
+    buttons = menu_buttons(frame.shape[1], frame.shape[0])
+    overlay = frame.copy()
+
+    def run():
+        for i, btn in enumerate(buttons):
+            btn.draw_on_overlay(overlay, i == 1)
+    return run
+
+def button_text_case(frame):
+    buttons = menu_buttons(frame.shape[1], frame.shape[0])
+    img = frame.copy()
+
+    def run():
+        for btn in buttons:
+            btn.draw_text_and_border(img)
+    return run
+
+def keyboard_overlay_case(frame):
+    keyboard = VirtualKeyboard(int(frame.shape[1] * 0.3), int(frame.shape[0] * 0.3))
+    img, overlay = frame.copy(), frame.copy()
+    cursors = [(keyboard.keys[3].x + 5, keyboard.keys[3].y + 5)]
+
+    def run():
+        keyboard.draw(img, overlay, cursors)
+    return run
+
+def keyboard_text_case(frame):
+    keyboard = VirtualKeyboard(int(frame.shape[1] * 0.3), int(frame.shape[0] * 0.3))
+    keyboard.input_text = "PLAYER"
+    img = frame.copy()
+
+    def run():
+        keyboard.draw_text(img)
+    return run
+
+def keyboard_layer_case(frame):
+    """keyboard.draw + draw_text through the scene's cached UILayer, as HandGame does it now."""
+    keyboard = VirtualKeyboard(int(frame.shape[1] * 0.3), int(frame.shape[0] * 0.3))
+    keyboard.input_text = "PLAYER"
+    layer = keyboard.ui_layer()
+    img, overlay = frame.copy(), frame.copy()
+    cursors = [(keyboard.keys[3].x + 5, keyboard.keys[3].y + 5)]
+
+    def run():
+        layer.draw_on_overlay(overlay, layer.hit_test(cursors))
+        layer.draw_text_and_border(img)
+        keyboard.draw_input(img)
+    return run
+
+def menu_layer_case(frame):
+    """The five difficulty buttons, fills and labels, through a cached UILayer."""
+    layer = UILayer(menu_buttons(frame.shape[1], frame.shape[0]))
+    img, overlay = frame.copy(), frame.copy()
+
+    def run():
+        layer.draw_on_overlay(overlay, layer.hit_test([]))
+        layer.draw_text_and_border(img)
+    return run
+
+def hit_test_case(frame):
+    """Four cursors against the login scene (keys plus SKIP): linear scan vs. the scene's layer (key_at plus HitIndex)."""
+    keyboard = VirtualKeyboard(int(frame.shape[1] * 0.3), int(frame.shape[0] * 0.3))
+    layer = keyboard.ui_layer([Button("SKIP", (frame.shape[1] - 280, frame.shape[0] - 80))])
+    rng = np.random.default_rng(0)
+    cursors = list(zip(rng.integers(0, frame.shape[1], 4).tolist(), rng.integers(0, frame.shape[0], 4).tolist()))
+
+    def run():
+        layer.hit_test(cursors)
+    return run
+
+def hit_scan_case(frame):
+    """The same four cursors, every button checked with is_hovering as the loop used to."""
+    keyboard = VirtualKeyboard(int(frame.shape[1] * 0.3), int(frame.shape[0] * 0.3))
+    buttons = keyboard.buttons() + [Button("SKIP", (frame.shape[1] - 280, frame.shape[0] - 80))]
+    rng = np.random.default_rng(0)
+    cursors = list(zip(rng.integers(0, frame.shape[1], 4).tolist(), rng.integers(0, frame.shape[0], 4).tolist()))
+
+    def run():
+        [any(btn.is_hovering(*c) for c in cursors) for btn in buttons]
+    return run
+
+def composite_case(frame):
+    """STEP 3 of the main loop: copy the frame for the overlay, draw on it, blend it back."""
+    buttons = menu_buttons(frame.shape[1], frame.shape[0])
+    img = frame.copy()
+
+    def run():
+        overlay = img.copy()
+        for btn in buttons:
+            btn.draw_on_overlay(overlay)
+        cv2.addWeighted(overlay, 0.3, img, 0.7, 0, img)
+    return run
+
+def dirty_composite_case(frame):
+    """The same composite through the dirty-tile Overlay, as HandGame does it now."""
+    buttons = menu_buttons(frame.shape[1], frame.shape[0])
+    img = frame.copy()
+    overlay = Overlay()
+
+    def run():
+        overlay.begin(img)
+        for btn in buttons:
+            btn.draw_on_overlay(overlay)
+        overlay.composite(0.3)
+    return run
+
+def collect_cases():
+    """(name, factory(frame)) for every benchmark, enemy-count variants included."""
+    cases = [
+        ("button.draw_on_overlay x5", button_overlay_case),
+        ("button.draw_text_and_border x5", button_text_case),
+        ("keyboard.draw", keyboard_overlay_case),
+        ("keyboard.draw_text", keyboard_text_case),
+        ("keyboard cached layer", keyboard_layer_case),
+        ("buttons cached layer x5", menu_layer_case),
+        ("hit test scan", hit_scan_case),
+        ("hit test index", hit_test_case),
+        ("composite", composite_case),
+        ("composite dirty tiles", dirty_composite_case),
+    ]
+    for count in ENEMY_COUNTS:
+        cases.append((f"draw_image_centered x{count}", lambda frame, n=count: sprite_case(frame, n)))
+        cases.append((f"spawn_enemy x{count}", lambda frame, n=count: spawn_case(frame, n)))
+    return cases
+
+def run_all(resolutions, repeat):
+    results = {}
+    for width, height in resolutions:
+        frame = synthetic_frame(width, height)
+        for name, factory in collect_cases():
+            median, p95 = measure(factory(frame), repeat)
+            results[f"{width}x{height} {name}"] = {"median_ms": median, "p95_ms": p95}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="flag medians this fraction slower than the baseline")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--resolutions", nargs="+", default=[f"{w}x{h}" for w, h in RESOLUTIONS])
+    args = parser.parse_args()
+
+    resolutions = [tuple(int(v) for v in r.split("x")) for r in args.resolutions]
+    results = run_all(resolutions, args.repeat)
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'benchmark':<42} {'median ms':>10} {'p95 ms':>9} {'baseline':>9} {'change':>8}")
+    for name, result in results.items():
+        line = f"{name:<42} {result['median_ms']:>10.3f} {result['p95_ms']:>9.3f}"
+        base = baseline.get(name)
+        if base:
+            change = result["median_ms"] / base["median_ms"] - 1
+            flag = "  REGRESSION" if change > args.tolerance else ""
+            if flag: regressions.append(name)
+            line += f" {base['median_ms']:>9.3f} {change:>+7.0%}{flag}"
+        print(line)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "opencv": cv2.__version__, "results": results}, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif not baseline:
+        print(f"No baseline at {args.baseline}, run with --save to create one")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark of the game rules alone, with no camera, model or window.
+
+Plays complete rounds of GameSimulation at one tick per frame. A bot aims at a
+random enemy with the right gesture on a fraction of the frames, so rounds
+include scoring, bosses and evolution before they end in a game over:
+
+    python -m benchmarks.bench_simulation --games 2000 --difficulty HARD --aim 0.3
+"""
+import argparse
+import random
+import time
+from src.Enemies import CIRCLE, SQUARE, BOSS
+from src.Simulation import GameSimulation
+
+def play_round(sim, bot, difficulty, aim, max_ticks):
+    """Plays one round to game over (or max_ticks) and returns (ticks, score)."""
+    sim.start(difficulty, special_enemies=True)
+    enemies = sim.enemies
+    dt = sim.clock.dt
+    for tick in range(max_ticks):
+        clicks, fists = [], []
+        if enemies.count and bot.random() < aim:
+            i = bot.randrange(enemies.count)
+            target = (float(enemies.x[i]), float(enemies.y[i]))
+            (clicks if enemies.kind[i] == CIRCLE else fists).append(target)
+        for event in sim.update(clicks, fists, dt):
+            if event[0] == "GAME_OVER":
+                return tick + 1, sim.score
+    return max_ticks, sim.score
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--difficulty", choices=["EASY", "NORMAL", "HARD"], default="NORMAL")
+    parser.add_argument("--aim", type=float, default=0.2,
+                        help="fraction of frames on which the bot hits an enemy")
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    counts = {(kind, evolved): 3 for kind in (CIRCLE, SQUARE, BOSS) for evolved in (False, True)}
+    sim = GameSimulation(args.width, args.height, counts, rng=random.Random(args.seed))
+    bot = random.Random(args.seed + 1)
+    total_ticks, scores = 0, []
+    start = time.perf_counter()
+    for _ in range(args.games):
+        ticks, score = play_round(sim, bot, args.difficulty, args.aim, args.max_ticks)
+        total_ticks += ticks
+        scores.append(score)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} {args.difficulty} rounds in {elapsed:.2f}s: "
+          f"{args.games / elapsed:.0f} games/s, {total_ticks / elapsed:.0f} ticks/s, "
+          f"{elapsed / total_ticks * 1e6:.1f} us/tick")
+    print(f"average round {total_ticks / args.games:.0f} ticks, "
+          f"average score {sum(scores) / len(scores):.1f}, best {max(scores)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import time
+import numpy as np
+
+def measure(fn, repeat=20, warmup=2):
+    """Runs fn repeatedly and returns (median, p95) wall time in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times)), float(np.percentile(times, 95))
+
+def synthetic_frame(width, height, seed=0):
+    """A noisy BGR frame, so blending cannot take any shortcuts on flat colors."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+def synthetic_icon(size=256, seed=1):
+    """A BGRA icon with a round, soft-edged alpha mask like the game's PNGs."""
+    rng = np.random.default_rng(seed)
+    icon = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+    yy, xx = np.mgrid[:size, :size]
+    r = np.hypot(xx - size / 2, yy - size / 2) / (size / 2)
+    icon[:, :, 3] = (np.clip(1.2 - r, 0, 1) * 255).astype(np.uint8)
+    return icon
@@ -0,0 +1,134 @@
+"""Prebaked asset pack: every icon set in one memory-mappable file.
+
+The pack holds the already decoded BGRA pixels of every icon at full size plus
+pre-resized copies ("mip levels") at the diameters the game actually draws, so
+startup maps one file instead of decoding PNGs, and the full-size pixels are only
+paged in if some size was not prebaked.
+
+Build it after changing any icon:
+
+    python -m src.AssetPack --root src/icons --out src/icons/assets.pack --widths 1280 1920
+"""
+import argparse
+import json
+import os
+import struct
+import cv2
+import numpy as np
+from src.Sprites import RESIZE_INTERPOLATION
+
+MAGIC = b"HGAP"
+VERSION = 3  # 2: mip levels resized like Sprite (linear), not INTER_AREA; 3: folder listings
+HEADER = struct.Struct("<4sIII")  # magic, version, index length, reserved
+ALIGN = 64
+
+def sprite_diameters(width):
+    """Diameters HandGame draws at a given screen width (enemy, boss, ship; see spawn_enemy)."""
+    return sorted({int(width * 0.035) * 2, int(width * 0.04) * 2, 80})
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+def _folder_listing(folder):
+    return sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+
+def build_pack(manager, out_path, diameters):
+    """Writes every image of an AssetManager (decoded from PNG) into a pack file."""
+    icons, blobs = [], []
+    offset = 0
+
+    def add(img, source):
+        nonlocal offset
+        levels = []
+        for size in [None] + list(diameters):
+            data = img if size is None else cv2.resize(img, (size, size), interpolation=RESIZE_INTERPOLATION)
+            data = np.ascontiguousarray(data)
+            if data.ndim == 2: data = data[:, :, None]
+            levels.append({"shape": list(data.shape), "offset": offset})
+            blobs.append(data)
+            offset += -(-data.nbytes // ALIGN) * ALIGN
+        icons.append({"source": source, "stamp": _source_stamp(source), "levels": levels})
+        return len(icons) - 1
+
+    # Folder listings and missing images let load_pack notice icons added after the build
+    index = {"sets": {}, "images": {}, "icons": icons, "folders": {}, "missing": []}
+    for name, paths in manager.sources["sets"].items():
+        index["sets"][name] = [add(img, path) for img, path in zip(manager.sets[name], paths)]
+        folder = manager.sources["folders"][name]
+        index["folders"][folder] = _folder_listing(folder)
+    for name, path in manager.sources["images"].items():
+        img = manager.images[name]
+        index["images"][name] = add(img, path) if img is not None else None
+        if img is None: index["missing"].append(path)
+
+    index_bytes = json.dumps(index).encode("utf-8")
+    data_start = -(-(HEADER.size + len(index_bytes)) // ALIGN) * ALIGN
+    with open(out_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index_bytes), 0))
+        f.write(index_bytes)
+        for level_blob, level in zip(blobs, (lv for icon in icons for lv in icon["levels"])):
+            f.seek(data_start + level["offset"])
+            f.write(level_blob.tobytes())
+    return os.path.getsize(out_path)
+
+def load_pack(path):
+    """Maps a pack file. Returns None if it is missing, invalid or older than its source PNGs.
+
+    The pack is also stale if a set folder's file list changed or a missing image
+    appeared since it was built.
+
+    The result has the same sets / images layout as AssetManager plus mips, a dict
+    from (id(icon), diameter) to the prebaked pixels of that icon.
+    """
+    if not os.path.exists(path): return None
+    with open(path, "rb") as f:
+        magic, version, index_len, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION: return None
+        index = json.loads(f.read(index_len).decode("utf-8"))
+    data_start = -(-(HEADER.size + index_len) // ALIGN) * ALIGN
+
+    stale = any(not os.path.exists(icon["source"]) or _source_stamp(icon["source"]) != icon["stamp"]
+                for icon in index["icons"])
+    stale = stale or any(_folder_listing(folder) != files for folder, files in index["folders"].items())
+    stale = stale or any(os.path.exists(source) for source in index["missing"])
+    if stale:
+        print(f"Asset pack {path} is out of date, decoding PNGs instead")
+        return None
+
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    icons, mips = [], {}
+    for icon in index["icons"]:
+        levels = []
+        for level in icon["levels"]:
+            shape = level["shape"]
+            start = data_start + level["offset"]
+            arr = np.asarray(buf[start:start + int(np.prod(shape))]).reshape(shape)
+            levels.append(arr[:, :, 0] if shape[2] == 1 else arr)
+        full = levels[0]
+        for arr in levels[1:]:
+            mips[(id(full), arr.shape[0])] = arr
+        icons.append(full)
+
+    return {
+        "sets": {name: [icons[i] for i in ids] for name, ids in index["sets"].items()},
+        "images": {name: icons[i] if i is not None else None for name, i in index["images"].items()},
+        "mips": mips,
+    }
+
+def main():
+    from src.Assets import AssetManager
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="src/icons")
+    parser.add_argument("--out", default="src/icons/assets.pack")
+    parser.add_argument("--widths", type=int, nargs="+", default=[1280],
+                        help="screen widths to prebake sprite sizes for")
+    args = parser.parse_args()
+
+    manager = AssetManager(args.root, pack_path=None)
+    diameters = sorted({d for w in args.widths for d in sprite_diameters(w)})
+    size = build_pack(manager, args.out, diameters)
+    print(f"Wrote {args.out}: {size / 2**20:.1f} MB, sizes {diameters}")
+
+if __name__ == "__main__":
+    main()
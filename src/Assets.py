@@ -0,0 +1,127 @@
+import os
+import cv2
+from src.AssetPack import load_pack
+from src.Enemies import CIRCLE, SQUARE, BOSS
+
+def load_images_from_folder(folder, paths=None):
+    """Loads all images from a folder into a list (sorted by file name).
+
+    If paths is a list, the path of every loaded image is appended to it.
+    """
+    images = []
+    if not os.path.exists(folder): return []
+    for filename in sorted(os.listdir(folder)):
+        try:
+            path = os.path.join(folder, filename)
+            img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if img is not None:
+                images.append(img)
+                if paths is not None: paths.append(path)
+        except: pass
+    return images
+
+def load_single_image(path):
+    """Loads a single image safely."""
+    if os.path.exists(path):
+        return cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    return None
+
+class AssetManager:
+    """Decodes every icon set once at startup.
+
+    The game never touches the disk again afterwards: evolving the ship after a
+    boss kill, or resetting it, only switches which of the already decoded sets
+    icons_pinch / icons_fist / ship point to.
+
+    If a current asset pack (see src/AssetPack.py) exists at pack_path it is
+    memory-mapped instead of decoding the PNGs, and its prebaked sprite sizes end
+    up in mips for the SpriteCache.
+
+    on_change, if set, is called with "reset" or "evolve" whenever the active
+    sets actually switch.
+    """
+    ICON_SETS = {
+        "pinch": "pinch",
+        "fist": "fist",
+        "special_pinch": "special_pinch",
+        "special_fist": "special_fist",
+    }
+    IMAGES = {
+        "ship_default": "spaceship/spaceship.png",
+        "enemy_special": "special/special_enemy.png",
+        "ship_evolved": "special/special_ship.png",
+    }
+
+    def __init__(self, root="src/icons", pack_path=None):
+        self.root = root
+        self.on_change = None
+        self.evolved = None
+        pack = load_pack(pack_path) if pack_path else None
+        self.from_pack = pack is not None
+        if pack:
+            self.sets, self.images, self.mips = pack["sets"], pack["images"], pack["mips"]
+        else:
+            self.load_pngs()
+        self.reset()
+
+    def load_pngs(self):
+        self.sources = {"sets": {}, "images": {}, "folders": {}}
+        self.sets = {}
+        for name, folder in self.ICON_SETS.items():
+            paths = []
+            folder = os.path.join(self.root, folder)
+            self.sets[name] = load_images_from_folder(folder, paths)
+            self.sources["sets"][name] = paths
+            self.sources["folders"][name] = folder
+        self.images = {}
+        for name, path in self.IMAGES.items():
+            self.sources["images"][name] = os.path.join(self.root, path)
+            self.images[name] = load_single_image(self.sources["images"][name])
+        self.mips = {}
+
+    def reset(self):
+        """Back to the default ship and enemy icons."""
+        if self.evolved is not False and self.on_change: self.on_change("reset")
+        self.evolved = False
+        self.icons_pinch = self.sets["pinch"]
+        self.icons_fist = self.sets["fist"]
+        self.ship = self.images["ship_default"]
+
+    def can_evolve(self):
+        """Evolving needs the evolved ship image; without it the game stays as it is."""
+        return self.images["ship_evolved"] is not None
+
+    def evolve(self):
+        """Switches to the evolved ship and special enemy icons (after a boss kill)."""
+        if not self.can_evolve(): return
+        if not self.evolved and self.on_change: self.on_change("evolve")
+        self.evolved = True
+        self.icons_pinch = self.sets["special_pinch"]
+        self.icons_fist = self.sets["special_fist"]
+        self.ship = self.images["ship_evolved"]
+
+    @property
+    def enemy_special(self):
+        return self.images["enemy_special"]
+
+    def enemy_icons(self, kind, evolved=False):
+        """Icon set an enemy of this kind draws its variant from."""
+        if kind == BOSS:
+            return [self.enemy_special] if self.enemy_special is not None else []
+        prefix = "special_" if evolved else ""
+        return self.sets[prefix + ("pinch" if kind == CIRCLE else "fist")]
+
+    def icon_counts(self):
+        """Size of every enemy icon set, as GameSimulation expects it."""
+        return {(kind, evolved): len(self.enemy_icons(kind, evolved))
+                for kind in (CIRCLE, SQUARE, BOSS) for evolved in (False, True)}
+
+    def all_images(self):
+        for images in self.sets.values():
+            yield from images
+        for img in self.images.values():
+            if img is not None: yield img
+
+    def nbytes(self):
+        """Memory used by the decoded assets, in bytes."""
+        return sum(img.nbytes for img in self.all_images())
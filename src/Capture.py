@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from collections import deque
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class FrameSource:
+    """Base class for everything HandGame can read frames from.
+
+    read() follows the cv2.VideoCapture contract and returns (success, img).
+    After a successful read, timestamp holds the capture time (perf_counter) and
+    frame_id the index of the frame. With realtime=True a recorded source is
+    played back at its native frame rate, otherwise as fast as possible.
+    """
+    def __init__(self, fps=30.0, realtime=True):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.timestamp = 0.0
+        self.frame_id = -1
+        self.frames_delivered = 0
+        self.start_time = None
+
+    def _pace(self, index):
+        """Sleeps until frame `index` is due, when playing back in realtime."""
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        if self.realtime:
+            due = self.start_time + index / self.fps
+            if due > now:
+                time.sleep(due - now)
+                now = due
+        return now
+
+    def _deliver(self, img, index):
+        self.timestamp = self._pace(index)
+        self.frame_id = index
+        self.frames_delivered += 1
+        return True, img
+
+    def read(self):
+        return False, None
+
+    def stats(self):
+        return {"delivered": self.frames_delivered}
+
+    def release(self):
+        pass
+
+class ThreadedCapture(FrameSource):
+    """Reads camera frames on a background thread and hands out only the newest one.
+
+    With drop_stale=True only one frame is buffered: a frame the game loop did not
+    pick up in time is overwritten (and counted as dropped) instead of queueing up
+    in the driver. If the loop asks for a frame before a new one arrived, the last
+    frame is returned again and counted as duplicated.
+    """
+    def __init__(self, index=0, width=1280, height=720, drop_stale=True, max_queue=4):
+        super().__init__()
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(3, width)
+        self.cap.set(4, height)
+        # Keep the driver-side buffer as short as possible, we buffer ourselves
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+        self.drop_stale = drop_stale
+        self.frames = deque(maxlen=1 if drop_stale else max_queue)
+        self.cond = threading.Condition()
+        self.last_frame = None
+
+        # --- Counters ---
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_duplicated = 0
+
+        self.running = True
+        self.finished = False
+        self.thread = threading.Thread(target=self._worker, name="capture", daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        frame_id = 0
+        while self.running:
+            success, img = self.cap.read()
+            now = time.perf_counter()
+            with self.cond:
+                if not success:
+                    self.finished = True
+                    self.cond.notify_all()
+                    break
+                if len(self.frames) == self.frames.maxlen:
+                    self.frames_dropped += 1
+                self.frames.append((img, now, frame_id))
+                self.frames_captured += 1
+                self.cond.notify_all()
+            frame_id += 1
+
+    def read(self, wait=True, timeout=1.0):
+        with self.cond:
+            if wait and not self.frames and not self.finished:
+                self.cond.wait_for(lambda: self.frames or self.finished, timeout)
+
+            if self.frames:
+                img, self.timestamp, self.frame_id = self.frames.popleft()
+                self.last_frame = img
+                self.frames_delivered += 1
+                return True, img
+
+            if self.finished or self.last_frame is None:
+                return False, None
+
+            # Nothing new yet, repeat the previous frame
+            self.frames_duplicated += 1
+            self.frames_delivered += 1
+            return True, self.last_frame
+
+    def stats(self):
+        with self.cond:
+            return {
+                "captured": self.frames_captured,
+                "delivered": self.frames_delivered,
+                "dropped": self.frames_dropped,
+                "duplicated": self.frames_duplicated,
+            }
+
+    def release(self):
+        self.running = False
+        self.thread.join(timeout=1.0)
+        self.cap.release()
+
+class VideoFileSource(FrameSource):
+    """Plays back a recorded video file."""
+    def __init__(self, path, realtime=True, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file: {path}")
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), realtime)
+        self.loop = loop
+        self.index = 0
+
+    def read(self):
+        success, img = self.cap.read()
+        if not success and self.loop and self.index > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, img = self.cap.read()
+        if not success:
+            return False, None
+        self.index += 1
+        return self._deliver(img, self.index - 1)
+
+    def release(self):
+        self.cap.release()
+
+class ImageSequenceSource(FrameSource):
+    """Plays back a directory of frames in file name order."""
+    def __init__(self, folder, fps=30.0, realtime=True, loop=False):
+        super().__init__(fps, realtime)
+        self.paths = sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise IOError(f"No frames found in: {folder}")
+        self.loop = loop
+        self.index = 0
+
+    def read(self):
+        for _ in range(len(self.paths)):
+            if self.index >= len(self.paths) and not self.loop:
+                break
+            path = self.paths[self.index % len(self.paths)]
+            self.index += 1
+            img = cv2.imread(path)
+            if img is not None:
+                return self._deliver(img, self.index - 1)
+        return False, None
+
+class SyntheticSource(FrameSource):
+    """Generates frames procedurally: a moving gradient with a few bouncing blobs.
+
+    There is no hand in the picture, so this is meant for profiling the pipeline
+    rather than for playing. Stops after num_frames frames if it is set.
+    """
+    def __init__(self, width=1280, height=720, fps=30.0, realtime=True, num_frames=None, seed=0):
+        super().__init__(fps, realtime)
+        self.width, self.height = width, height
+        self.num_frames = num_frames
+        self.index = 0
+        rng = np.random.default_rng(seed)
+        self.blobs = rng.uniform(0, 1, size=(5, 4))  # x, y, vx, vy (normalized)
+        self.blobs[:, 2:] = (self.blobs[:, 2:] - 0.5) * 0.02
+
+        xs = np.linspace(0, 255, width, dtype=np.float32)
+        ys = np.linspace(0, 255, height, dtype=np.float32)
+        self.base = np.empty((height, width, 3), dtype=np.uint8)
+        self.base[:, :, 0] = xs[None, :]
+        self.base[:, :, 1] = ys[:, None]
+        self.base[:, :, 2] = 128
+
+    def read(self):
+        if self.num_frames is not None and self.index >= self.num_frames:
+            return False, None
+        shift = (self.index * 4) % self.width
+        img = np.roll(self.base, shift, axis=1)
+
+        self.blobs[:, :2] += self.blobs[:, 2:]
+        out = (self.blobs[:, :2] < 0) | (self.blobs[:, :2] > 1)
+        self.blobs[:, 2:][out] *= -1
+        for x, y, _, _ in self.blobs:
+            center = (int(x * self.width), int(y * self.height))
+            cv2.circle(img, center, 60, (40, 180, 220), -1)
+
+        self.index += 1
+        return self._deliver(img, self.index - 1)
+
+def open_frame_source(spec="camera", realtime=True, width=1280, height=720):
+    """Creates a frame source from a command line spec.
+
+    camera[:INDEX]   live webcam (default)
+    video:PATH       recorded video file
+    images:DIR       directory of frames
+    synthetic[:N]    procedural frames, N frames or endless
+    A bare path is treated as a video file or, if it is a directory, as frames.
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "camera":
+        return ThreadedCapture(int(arg or 0), width, height)
+    if kind == "video":
+        return VideoFileSource(arg, realtime)
+    if kind == "images":
+        return ImageSequenceSource(arg, realtime=realtime)
+    if kind == "synthetic":
+        return SyntheticSource(width, height, realtime=realtime, num_frames=int(arg) if arg else None)
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec, realtime=realtime)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, realtime)
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -0,0 +1,48 @@
+import time
+
+class FixedStepClock:
+    """Turns real time into a whole number of fixed-length simulation ticks.
+
+    advance() is called once per rendered frame and returns how many ticks of
+    dt seconds the simulation should run; the leftover time is kept for the next
+    frame and exposed as alpha (0..1) for interpolated drawing. This keeps game
+    speed independent of the render frame rate. At most max_ticks are run per
+    frame so a long stall does not snowball.
+
+    advance(dt) feeds in a given frame time instead of the real clock, so the
+    simulation can also run faster than real time (benchmarks, tests).
+
+    With lockstep=True every frame is exactly one tick, which makes replays
+    deterministic regardless of how fast the machine renders.
+    """
+    def __init__(self, tick_rate=30.0, max_ticks=5, lockstep=False):
+        self.dt = 1.0 / tick_rate
+        self.max_ticks = max_ticks
+        self.lockstep = lockstep
+        self.reset()
+
+    def reset(self):
+        """Forgets all accumulated time, e.g. when the game is resumed."""
+        self.last = time.perf_counter()
+        self.accumulator = 0.0
+
+    def advance(self, dt=None):
+        if self.lockstep:
+            return 1
+        if dt is None:
+            now = time.perf_counter()
+            dt = now - self.last
+            self.last = now
+        self.accumulator += dt
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self.accumulator = self.dt * ticks
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far real time is into the next tick, for interpolating positions."""
+        if self.lockstep: return 1.0
+        return self.accumulator / self.dt
@@ -1,6 +1,12 @@
+from collections import OrderedDict
 import cv2
+import numpy as np
+from src.Overlay import Overlay, fill_rect
 
 class Button:
+    BORDER_COLOR = (50, 50, 50)
+    TEXT_COLOR = (0, 0, 0)
+
     def __init__(self, text, pos, size=(200, 60), color=(200, 200, 200), text_scale=1.0):
         self.text = text
         self.x, self.y = pos
@@ -8,63 +14,400 @@ class Button:
         self.color = color
         self.hover_color = (0, 255, 0)
         self.text_scale = text_scale
+        self.label = None
 
     def is_hovering(self, x, y):
         return self.x < x < self.x + self.w and self.y < y < self.y + self.h
 
     def draw_on_overlay(self, overlay, is_hovered=False):
         color = self.hover_color if is_hovered else self.color
-        cv2.rectangle(overlay, (self.x, self.y), (self.x + self.w, self.y + self.h), color, -1)
+        fill_rect(overlay, (self.x, self.y), (self.x + self.w, self.y + self.h), color)
         
-    def draw_text_and_border(self, img):
-        cv2.rectangle(img, (self.x, self.y), (self.x + self.w, self.y + self.h), (50, 50, 50), 2)
-        font = cv2.FONT_HERSHEY_TRIPLEX 
-        scale = self.text_scale
-        text_size = cv2.getTextSize(self.text, font, scale, 2)[0]
-        while text_size[0] > self.w - 20: 
+    def style_key(self):
+        """Everything that affects how the button looks, to detect changes."""
+        return (self.text, self.color, self.hover_color, self.x, self.y, self.w, self.h, self.text_scale)
+
+    def layout(self):
+        """The cached Label for the current text and size (looked up again when either changes)."""
+        key = (self.text, self.w, self.h, self.text_scale)
+        if self.label is None or self.label.key != key:
+            self.label = LABELS.get(*key)
+        return self.label
+
+    def draw_text_and_border(self, img, border_color=BORDER_COLOR, text_color=TEXT_COLOR, offset=(0, 0)):
+        x, y = self.x - offset[0], self.y - offset[1]
+        cv2.rectangle(img, (x, y), (x + self.w, y + self.h), border_color, 2)
+        self.layout().draw(img, x, y, text_color)
+
+class Label:
+    """A button label fitted, positioned and rasterized once.
+
+    The scale shrinks in steps of 0.1 until the text fits the button width
+    minus 20 pixels, and the text is centered; that getTextSize loop used to run
+    for every button every frame. alpha is putText's coverage of the label,
+    cropped to the glyphs, for stamping it into cached layers (UILayer).
+    """
+    FONT = cv2.FONT_HERSHEY_TRIPLEX
+    THICKNESS = 2
+
+    def __init__(self, text, w, h, text_scale):
+        self.key = (text, w, h, text_scale)
+        self.text = text
+        scale = text_scale
+        text_size = cv2.getTextSize(text, self.FONT, scale, self.THICKNESS)[0]
+        while text_size[0] > w - 20:
             scale -= 0.1
-            text_size = cv2.getTextSize(self.text, font, scale, 2)[0]
-        
-        text_x = self.x + (self.w - text_size[0]) // 2
-        text_y = self.y + (self.h + text_size[1]) // 2
-        cv2.putText(img, self.text, (text_x, text_y), font, scale, (0,0,0), 2)
+            text_size = cv2.getTextSize(text, self.FONT, scale, self.THICKNESS)[0]
+        self.scale = scale
+        # Text origin relative to the button's top left corner
+        self.org = ((w - text_size[0]) // 2, (h + text_size[1]) // 2)
+
+        pad = 2 * text_size[1] + 10  # glyphs may reach past getTextSize's box
+        canvas = np.zeros((text_size[1] + 2 * pad, text_size[0] + 2 * pad), dtype=np.uint8)
+        cv2.putText(canvas, text, (pad, pad + text_size[1]), self.FONT, scale, 255, self.THICKNESS)
+        ys, xs = np.nonzero(canvas)
+        if len(ys) == 0:
+            self.alpha, self.offset = np.zeros((0, 0), dtype=np.uint8), (0, 0)
+            return
+        self.alpha = canvas[ys.min():ys.max() + 1, xs.min():xs.max() + 1].copy()
+        # Top left corner of alpha relative to the button
+        self.offset = (self.org[0] + xs.min() - pad, self.org[1] + ys.min() - pad - text_size[1])
+
+    def nbytes(self):
+        return self.alpha.nbytes
+
+    def draw(self, img, x, y, color):
+        """putText with the cached layout, for a button at (x, y)."""
+        cv2.putText(img, self.text, (x + self.org[0], y + self.org[1]), self.FONT, self.scale, color, self.THICKNESS)
+
+    def stamp(self, mask, x, y):
+        """Adds the label's coverage to a single channel mask, for a button at (x, y)."""
+        x, y = x + self.offset[0], y + self.offset[1]
+        h, w = mask.shape[:2]
+        sx, sy = max(0, -x), max(0, -y)
+        ex, ey = min(self.alpha.shape[1], w - x), min(self.alpha.shape[0], h - y)
+        if sx >= ex or sy >= ey: return
+        roi = mask[y + sy:y + ey, x + sx:x + ex]
+        np.maximum(roi, self.alpha[sy:ey, sx:ex], out=roi)
+
+class LabelCache:
+    """LRU cache of Labels keyed by (text, width, height, text scale).
+
+    Buttons with the same text and size share one entry; a button whose text
+    changes at runtime simply looks up (or creates) the entry for the new text.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, w, h, text_scale):
+        key = (text, w, h, text_scale)
+        label = self.entries.get(key)
+        if label is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return label
+
+        self.misses += 1
+        label = self.entries[key] = Label(text, w, h, text_scale)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return label
+
+    def nbytes(self):
+        return sum(label.nbytes() for label in self.entries.values())
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "kb": round(self.nbytes() / 1024, 1)}
+
+LABELS = LabelCache()
+
+def merge_boxes(boxes, gap):
+    """Merges (x1, y1, x2, y2) boxes (exclusive ends) that are at most gap pixels
+    apart, so a block of keys becomes one box but far apart buttons stay apart."""
+    boxes = list(boxes)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] <= b[2] + gap and b[0] <= a[2] + gap and a[1] <= b[3] + gap and b[1] <= a[3] + gap:
+                    boxes[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged: break
+    return boxes
+
+class HitIndex:
+    """Finds the button under a point by checking one grid cell, not every button.
+
+    Each button is listed in every cell x cell pixel cell its box touches; a
+    lookup only runs is_hovering on the few buttons of the point's cell. Where
+    buttons overlap, the first one in list order wins.
+    """
+    def __init__(self, buttons, cell=64):
+        self.buttons = list(buttons)
+        self.cell = cell
+        self.cells = {}
+        for i, btn in enumerate(self.buttons):
+            for cy in range(btn.y // cell, (btn.y + btn.h) // cell + 1):
+                for cx in range(btn.x // cell, (btn.x + btn.w) // cell + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+
+    def find(self, x, y):
+        """Index of the button under (x, y), or None."""
+        for i in self.cells.get((int(x // self.cell), int(y // self.cell)), ()):
+            if self.buttons[i].is_hovering(x, y): return i
+        return None
+
+class UILayer:
+    """The buttons of one scene, pre-rendered once and pasted every frame.
+
+    Instead of drawing every fill, border and label each frame, the scene is
+    rendered once into two cached layers with masks: the fills (blended as part
+    of the overlay) and the borders and labels (drawn over the composited
+    frame). Labels may be antialiased (OpenCV 5 text), so the label layer keeps
+    per-pixel coverage and blends partly covered pixels the way putText does.
+    Each frame only the buttons whose hover state changed are
+    re-filled; the layers are rebuilt when a button's text, color or position
+    changes (Button.style_key). panels are filled (p1, p2, color) boxes drawn
+    under the buttons, outlines are (p1, p2, color, thickness) boxes drawn
+    under the labels.
+
+    hit_test() resolves every cursor to the button under it through a HitIndex
+    (button_at), once per frame; the result drives both the hover fills and the clicks.
+    """
+    PAD = 4  # room for the 2px borders around the outermost buttons
+
+    def __init__(self, buttons, panels=(), outlines=()):
+        self.buttons = list(buttons)
+        self.panels = list(panels)
+        self.outlines = list(outlines)
+        self.keys = None
+
+    def build(self):
+        boxes = [(b.x, b.y, b.x + b.w, b.y + b.h) for b in self.buttons]
+        boxes += [(*p1, *p2) for p1, p2, *_ in self.panels + self.outlines]
+        pad = self.PAD
+        x1 = min(box[0] for box in boxes) - pad
+        y1 = min(box[1] for box in boxes) - pad
+        x2 = max(box[2] for box in boxes) + pad
+        y2 = max(box[3] for box in boxes) + pad
+        self.origin = (x1, y1)
+        shape = (y2 - y1 + 1, x2 - x1 + 1)
+        self.fill = np.zeros(shape + (3,), dtype=np.uint8)
+        self.fill_mask = np.zeros(shape, dtype=np.uint8)
+        self.text = np.zeros(shape + (3,), dtype=np.uint8)
+        self.text_alpha = np.zeros(shape, dtype=np.uint8)
+
+        for p1, p2, color in self.panels:
+            self._fill_rect(p1, p2, color)
+        for btn in self.buttons:
+            self._fill_rect((btn.x, btn.y), (btn.x + btn.w, btn.y + btn.h), btn.color)
+        for p1, p2, color, thickness in self.outlines:
+            q1, q2 = self._local(p1), self._local(p2)
+            self._stamp(lambda mask: cv2.rectangle(mask, q1, q2, 255, thickness), color)
+        for btn in self.buttons:
+            # Border and label separately, each has its own color
+            self._stamp(lambda mask: btn.draw_text_and_border(mask, 255, 0, offset=self.origin), Button.BORDER_COLOR)
+            self._stamp(lambda mask: btn.layout().stamp(mask, *self._local((btn.x, btn.y))), Button.TEXT_COLOR)
+        self.text_mask = np.where(self.text_alpha == 255, 255, 0).astype(np.uint8)
+        # Partly covered pixels per channel: result = (dst * (255 - a) + color * a + 127) // 255
+        ys, xs = np.nonzero((self.text_alpha > 0) & (self.text_alpha < 255))
+        alpha = np.repeat(self.text_alpha[ys, xs].astype(np.uint32), 3)
+        self.partial = (ys, xs, 255 - alpha, self.text[ys, xs].reshape(-1).astype(np.uint32) * alpha + 127)
+        self.partial_index = None
+
+        # Only the boxes around the elements are pasted, not the whole bounding box
+        self.regions = merge_boxes([(bx1 - x1 - pad, by1 - y1 - pad, bx2 - x1 + pad + 1, by2 - y1 + pad + 1)
+                                    for bx1, by1, bx2, by2 in boxes], pad)
+
+        self.hovered = [False] * len(self.buttons)
+        self.keys = [btn.style_key() for btn in self.buttons]
+        self.index = HitIndex(self.hit_buttons())
+        self.slots = {id(btn): i for i, btn in enumerate(self.buttons)}
+        # Re-filling one button on hover is only exact if no later button covers part of it
+        self.overlapping = any(a.x <= b.x + b.w and b.x <= a.x + a.w and a.y <= b.y + b.h and b.y <= a.y + a.h
+                               for i, a in enumerate(self.buttons) for b in self.buttons[i + 1:])
+
+    def _local(self, p):
+        return (p[0] - self.origin[0], p[1] - self.origin[1])
+
+    def _stamp(self, draw, color):
+        """Draws one solid-colored element: draw(mask) renders its coverage into a blank mask."""
+        mask = np.zeros(self.text_alpha.shape, dtype=np.uint8)
+        draw(mask)
+        self.text[mask > 0] = color
+        np.maximum(self.text_alpha, mask, out=self.text_alpha)
+
+    def _fill_rect(self, p1, p2, color):
+        q1, q2 = self._local(p1), self._local(p2)
+        cv2.rectangle(self.fill, q1, q2, color, -1)
+        cv2.rectangle(self.fill_mask, q1, q2, 255, -1)
+
+    def validate(self):
+        """Rebuilds the layers if any button changed its look since they were rendered."""
+        if self.keys is None or self.keys != [btn.style_key() for btn in self.buttons]:
+            self.build()
+
+    def set_hover(self, hovered):
+        """Re-fills just the buttons whose hover state changed."""
+        changed = [i for i, h in enumerate(hovered) if h != self.hovered[i]]
+        if not changed: return
+        if self.overlapping:
+            self.build()
+            changed = [i for i, h in enumerate(hovered) if h]
+        for i in changed:
+            btn = self.buttons[i]
+            color = btn.hover_color if hovered[i] else btn.color
+            cv2.rectangle(self.fill, self._local((btn.x, btn.y)), self._local((btn.x + btn.w, btn.y + btn.h)), color, -1)
+        self.hovered = list(hovered)
+
+    def hit_buttons(self):
+        """The buttons the HitIndex covers."""
+        return self.buttons
+
+    def button_at(self, x, y):
+        """The button under (x, y), or None."""
+        i = self.index.find(x, y)
+        return self.index.buttons[i] if i is not None else None
+
+    def hit_test(self, positions):
+        """The button under each position (None where there is none)."""
+        self.validate()
+        return [self.button_at(x, y) for x, y in positions]
+
+    def draw_on_overlay(self, overlay, hits):
+        """The fills, with the buttons in hits (from hit_test) highlighted, onto an Overlay or a plain image."""
+        self.validate()
+        hovered = [False] * len(self.buttons)
+        for btn in hits:
+            if btn is not None: hovered[self.slots[id(btn)]] = True
+        self.set_hover(hovered)
+        target = overlay.paste if isinstance(overlay, Overlay) else lambda *args: paste(overlay, *args)
+        for x1, y1, x2, y2 in self.regions:
+            target((self.origin[0] + x1, self.origin[1] + y1), self.fill[y1:y2, x1:x2], self.fill_mask[y1:y2, x1:x2])
+
+    def draw_text_and_border(self, img):
+        """The borders, labels and outlines onto the composited frame."""
+        self.validate()
+        for x1, y1, x2, y2 in self.regions:
+            paste(img, (self.origin[0] + x1, self.origin[1] + y1), self.text[y1:y2, x1:x2], self.text_mask[y1:y2, x1:x2])
+        # Antialiased edges, with the same rounding as putText's own blend
+        index, inv_alpha, color = self.blend_index(img.shape)
+        flat = img.reshape(-1)  # frames are contiguous, so this is a view
+        v = flat.take(index).astype(np.uint32)
+        v *= inv_alpha
+        v += color
+        v *= 32897  # v // 255 for v < 65536
+        v >>= 23
+        flat.put(index, v.astype(np.uint8))
+
+    def blend_index(self, shape):
+        """Flat indices into a frame of this shape of the partly covered label pixels, with their weights."""
+        if self.partial_index is None or self.partial_index[0] != shape:
+            ys, xs, inv_alpha, color = self.partial
+            ys, xs = ys + self.origin[1], xs + self.origin[0]
+            inside = np.repeat((ys >= 0) & (xs >= 0) & (ys < shape[0]) & (xs < shape[1]), 3)
+            index = ((ys * shape[1] + xs) * 3)[:, None] + np.arange(3)
+            self.partial_index = (shape, (index.reshape(-1)[inside], inv_alpha[inside], color[inside]))
+        return self.partial_index[1]
+
+class KeyboardLayer(UILayer):
+    """UILayer of a keyboard scene.
+
+    Letter keys are found arithmetically from the keyboard grid
+    (VirtualKeyboard.key_at); only DEL, ENTER and the scene's own buttons go
+    through the HitIndex.
+    """
+    def __init__(self, keyboard, buttons, panels=(), outlines=()):
+        super().__init__(buttons, panels, outlines)
+        self.keyboard = keyboard
+
+    def hit_buttons(self):
+        return [btn for btn in self.buttons if btn not in self.keyboard.key_set]
+
+    def button_at(self, x, y):
+        key = self.keyboard.key_at(x, y)
+        return key if key is not None else super().button_at(x, y)
+
+def paste(img, origin, pixels, mask):
+    """Copies the masked pixels into img with their top left corner at origin, clipped to img."""
+    x, y = origin
+    h, w = img.shape[:2]
+    sx, sy = max(0, -x), max(0, -y)
+    ex, ey = min(pixels.shape[1], w - x), min(pixels.shape[0], h - y)
+    if sx >= ex or sy >= ey: return
+    cv2.copyTo(pixels[sy:ey, sx:ex], mask[sy:ey, sx:ex], img[y + sy:y + ey, x + sx:x + ex])
 
 class VirtualKeyboard:
+    COLUMNS = 7
+    PITCH = 70     # distance between neighbouring keys
+    KEY_SIZE = 60
+
     def __init__(self, start_x, start_y):
+        self.start_x, self.start_y = start_x, start_y
         self.keys = []
         self.input_text = ""
         chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
         for i, char in enumerate(chars):
-            row = i // 7
-            col = i % 7
-            x = start_x + col * 70
-            y = start_y + row * 70
-            self.keys.append(Button(char, (x, y), (60, 60), text_scale=0.8))
+            row = i // self.COLUMNS
+            col = i % self.COLUMNS
+            x = start_x + col * self.PITCH
+            y = start_y + row * self.PITCH
+            self.keys.append(Button(char, (x, y), (self.KEY_SIZE, self.KEY_SIZE), text_scale=0.8))
         self.btn_del = Button("DEL", (start_x, start_y + 280), (130, 60))
         self.btn_enter = Button("ENTER", (start_x + 140, start_y + 280), (200, 60))
+        self.key_set = set(self.keys)
+
+    # Input box above the keys
+    BOX = ((400, 100), (880, 180))
+
+    def buttons(self):
+        return self.keys + [self.btn_del, self.btn_enter]
+
+    def ui_layer(self, extra_buttons=()):
+        """A UILayer with the input box and all keys (plus a scene's own buttons)."""
+        return KeyboardLayer(self, self.buttons() + list(extra_buttons),
+                             panels=[(*self.BOX, (255, 255, 255))], outlines=[(*self.BOX, (0, 0, 0), 2)])
 
     def draw(self, img, overlay, cursor_positions):
-        cv2.rectangle(overlay, (400, 100), (880, 180), (255, 255, 255), -1)
-        buttons = self.keys + [self.btn_del, self.btn_enter]
-        for btn in buttons:
+        fill_rect(overlay, *self.BOX, (255, 255, 255))
+        for btn in self.buttons():
             is_hover = any(btn.is_hovering(*pos) for pos in cursor_positions)
             btn.draw_on_overlay(overlay, is_hover)
+
+    def draw_input(self, img):
+        """The typed text, the only part of the keyboard that is not static."""
+        cv2.putText(img, self.input_text + "|", (420, 160), cv2.FONT_HERSHEY_TRIPLEX , 1.5, (0,0,0), 3)
             
     def draw_text(self, img):
-        cv2.rectangle(img, (400, 100), (880, 180), (0, 0, 0), 2)
-        cv2.putText(img, self.input_text + "|", (420, 160), cv2.FONT_HERSHEY_TRIPLEX , 1.5, (0,0,0), 3)
-        buttons = self.keys + [self.btn_del, self.btn_enter]
-        for btn in buttons:
+        cv2.rectangle(img, *self.BOX, (0, 0, 0), 2)
+        self.draw_input(img)
+        for btn in self.buttons():
             btn.draw_text_and_border(img)
 
-    def handle_click(self, pos):
-        for btn in self.keys:
-            if btn.is_hovering(pos[0], pos[1]):
-                if len(self.input_text) < 10: self.input_text += btn.text
-                return None
-        if self.btn_del.is_hovering(pos[0], pos[1]):
+    def key_at(self, x, y):
+        """The letter key under (x, y), or None, computed from the grid instead of checking every key."""
+        col, dx = divmod(x - self.start_x, self.PITCH)
+        row, dy = divmod(y - self.start_y, self.PITCH)
+        if 0 <= col < self.COLUMNS and row >= 0 and 0 < dx < self.KEY_SIZE and 0 < dy < self.KEY_SIZE:
+            i = int(row) * self.COLUMNS + int(col)
+            if i < len(self.keys): return self.keys[i]
+        return None
+
+    def press(self, btn):
+        """Handles a click that landed on btn (any button, or None)."""
+        if btn is None: return None
+        if btn is self.btn_del:
             self.input_text = self.input_text[:-1]
-            return None
-        if self.btn_enter.is_hovering(pos[0], pos[1]):
+        elif btn is self.btn_enter:
             if len(self.input_text) > 0: return "ENTER_PRESSED"
-        return None
\ No newline at end of file
+        elif btn in self.key_set:
+            if len(self.input_text) < 10: self.input_text += btn.text
+        return None
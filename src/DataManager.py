@@ -1,5 +1,6 @@
 import json
 import os
+import time
 
 class DataManager:
     def __init__(self):
@@ -8,6 +9,7 @@ class DataManager:
             os.makedirs(self.folder)
         
         self.filepath = os.path.join(self.folder, "users.json")
+        self.on_save = None  # optional hook, called as on_save(start, end) after every save
         self.data = self.load_data()
 
     def load_data(self):
@@ -20,8 +22,10 @@ class DataManager:
             return {}
 
     def save_data(self):
+        start = time.perf_counter()
         with open(self.filepath, 'w') as f:
             json.dump(self.data, f, indent=4)
+        if self.on_save: self.on_save(start, time.perf_counter())
 
     def get_user_list(self):
         return list(self.data.keys())
@@ -0,0 +1,169 @@
+import heapq
+import numpy as np
+from src.SpatialGrid import SpatialHash
+
+# Enemy kinds, stored as small ints in EnemyStore.kind
+CIRCLE, SQUARE, BOSS = 0, 1, 2
+KIND_NAMES = ["circle", "square", "boss"]
+KIND_COLORS = [(0, 0, 255), (255, 0, 0), (0, 255, 255)]  # fallback colors when an icon is missing
+
+class EnemyStore:
+    """All live enemies as a structure of NumPy arrays.
+
+    Positions, velocities, radii, kinds and icon variants live in parallel
+    arrays, so movement, hit tests and removals are batched array operations
+    instead of a Python loop over dicts. An enemy's icon is a variant index into
+    the icon set of its kind (-1 means no icon, draw a fallback shape) plus
+    whether it spawned after the ship evolved; the renderer maps that to an image.
+
+    Once there are at least grid_threshold enemies, hit tests go through a
+    spatial hash that is rebuilt lazily, at most once per tick, so a pinch or fist
+    only looks at the enemies in nearby cells.
+
+    Hit tests are swept: each enemy is tested as a capsule from where it was at
+    the previous hit test (sweep_x/sweep_y) to where it is now, so a fast enemy
+    cannot jump over a pinch or fist between two frames.
+
+    Enemies fly in a straight line at constant speed, so the tick at which each
+    one reaches the ship is known at spawn. Positions are spawn point + steps *
+    velocity (position()) rather than summed up tick by tick, so that holds
+    down to the float rounding. Those impact ticks are kept in a heap (removed
+    enemies are skipped lazily), and checking for game over is a peek.
+    """
+    FIELDS = {"x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64,
+              "origin_x": np.float64, "origin_y": np.float64, "steps": np.float64,  # spawn point, ticks moved
+              "prev_x": np.float64, "prev_y": np.float64,  # position before the last step
+              "sweep_x": np.float64, "sweep_y": np.float64,  # position at the last hit test
+              "radius": np.float64, "kind": np.int8, "variant": np.int16, "evolved": np.bool_, "uid": np.int64}
+
+    def __init__(self, capacity=64, cell_size=128, grid_threshold=1000):
+        self.count = 0
+        self.next_uid = 0
+        self.alive = set()
+        self.impacts = []  # heap of (impact tick, uid)
+        self.data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()}
+        self.grid = SpatialHash(cell_size)
+        self.grid_threshold = grid_threshold
+        self.grid_dirty = True
+
+    def __len__(self):
+        return self.count
+
+    def __getattr__(self, name):
+        # store.x, store.kind, ... are views on the live part of each array
+        data = self.__dict__.get("data")
+        if data is not None and name in data:
+            return data[name][:self.count]
+        raise AttributeError(name)
+
+    def add(self, x, y, vx, vy, radius, kind, variant=-1, evolved=False, impact_tick=None):
+        if self.count == len(self.data["x"]):
+            for name, arr in self.data.items():
+                self.data[name] = np.concatenate([arr, np.zeros_like(arr)])
+        i = self.count
+        uid = self.next_uid
+        self.next_uid += 1
+        values = {"x": x, "y": y, "vx": vx, "vy": vy, "origin_x": x, "origin_y": y, "steps": 0,
+                  "prev_x": x, "prev_y": y, "sweep_x": x, "sweep_y": y,
+                  "radius": radius, "kind": kind, "variant": variant, "evolved": evolved, "uid": uid}
+        for name, value in values.items():
+            self.data[name][i] = value
+        self.count += 1
+        self.alive.add(uid)
+        if impact_tick is not None:
+            heapq.heappush(self.impacts, (impact_tick, uid))
+        self.grid_dirty = True
+
+    def step(self):
+        """Moves every enemy by one simulation tick."""
+        # Whole arrays, slots past count included: cheaper than slicing for small swarms
+        d = self.data
+        np.copyto(d["prev_x"], d["x"])
+        np.copyto(d["prev_y"], d["y"])
+        np.add(d["steps"], 1.0, out=d["steps"])
+        # Same expression as position(), element for element
+        np.multiply(d["steps"], d["vx"], out=d["x"])
+        np.add(d["origin_x"], d["x"], out=d["x"])
+        np.multiply(d["steps"], d["vy"], out=d["y"])
+        np.add(d["origin_y"], d["y"], out=d["y"])
+        self.grid_dirty = True
+
+    @staticmethod
+    def position(x, y, vx, vy, steps):
+        """Where an enemy spawned at (x, y) is after steps ticks, bit for bit as step() puts it."""
+        return x + steps * vx, y + steps * vy
+
+    def hits(self, points, margin, mask=None):
+        """Enemies within radius + margin of any of the points, as a boolean mask."""
+        if not len(points) or not self.count:
+            return np.zeros(self.count, dtype=bool)
+        if self.count < self.grid_threshold:
+            hit = self.hits_bruteforce(points, margin)
+        else:
+            hit = self.hits_grid(points, margin)
+        return hit & mask if mask is not None else hit
+
+    def hits_bruteforce(self, points, margin):
+        """Tests every enemy's sweep against every point."""
+        pts = np.asarray(points, dtype=np.float64)
+        dist = segment_distance(self.sweep_x[:, None], self.sweep_y[:, None], self.x[:, None], self.y[:, None],
+                                pts[None, :, 0], pts[None, :, 1])
+        return (dist < (self.radius + margin)[:, None]).any(axis=1)
+
+    def hits_grid(self, points, margin):
+        """Tests each point only against the enemies in nearby grid cells."""
+        if self.grid_dirty:
+            self.grid.rebuild(self.x, self.y)
+            self.grid_dirty = False
+        hit = np.zeros(self.count, dtype=bool)
+        # The grid holds current positions, so widen the search by the longest sweep
+        sweep = float(np.hypot(self.x - self.sweep_x, self.y - self.sweep_y).max())
+        reach = float(self.radius.max()) + margin + sweep
+        for px, py in points:
+            idx = self.grid.query(px, py, reach)
+            if len(idx):
+                dist = segment_distance(self.sweep_x[idx], self.sweep_y[idx], self.x[idx], self.y[idx], px, py)
+                hit[idx[dist < self.radius[idx] + margin]] = True
+        return hit
+
+    def end_sweep(self):
+        """Starts the next sweep at the current positions; call after the frame's hit tests."""
+        d = self.data
+        np.copyto(d["sweep_x"], d["x"])
+        np.copyto(d["sweep_y"], d["y"])
+
+    def interpolated(self, alpha):
+        """Positions blended between the previous and current tick, for drawing."""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def next_impact(self):
+        """Earliest tick at which a live enemy reaches the ship (inf if none will)."""
+        impacts = self.impacts
+        while impacts and impacts[0][1] not in self.alive:
+            heapq.heappop(impacts)
+        return impacts[0][0] if impacts else float("inf")
+
+    def remove(self, mask):
+        """Removes the enemies selected by a boolean mask, keeping the order of the rest."""
+        self.alive.difference_update(self.uid[mask].tolist())
+        keep = ~mask
+        n = int(keep.sum())
+        for name, arr in self.data.items():
+            arr[:n] = arr[:self.count][keep]
+        self.count = n
+        self.grid_dirty = True
+
+    def clear(self):
+        self.count = 0
+        self.grid_dirty = True
+        self.alive.clear()
+        self.impacts = []
+
+def segment_distance(ax, ay, bx, by, px, py):
+    """Distance from points (px, py) to segments a-b, broadcasting over all arguments."""
+    sx, sy = bx - ax, by - ay
+    length2 = sx * sx + sy * sy
+    t = ((px - ax) * sx + (py - ay) * sy) / np.where(length2 > 0, length2, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(ax + t * sx - px, ay + t * sy - py)
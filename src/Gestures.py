@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+# MediaPipe hand landmark ids used by the gestures
+WRIST, THUMB_TIP, INDEX_TIP, MIDDLE_MCP = 0, 4, 8, 9
+FINGER_TIPS = [8, 12, 16, 20]
+
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+]
+
+def landmarks_to_array(multi_hand_landmarks):
+    """Converts MediaPipe landmark lists into one (hands, 21, 3) float32 array."""
+    hands = multi_hand_landmarks or []
+    arr = np.empty((len(hands), 21, 3), dtype=np.float32)
+    for i, hand_lms in enumerate(hands):
+        arr[i] = [(lm.x, lm.y, lm.z) for lm in hand_lms.landmark]
+    return arr
+
+class HandGestures:
+    """Pinch, fist and cursor data for every hand in one frame.
+
+    Evaluated once per frame for all hands at once and then reused by both the
+    input and the drawing phase. Per-hand values are plain Python tuples/bools so
+    they can go straight into cv2 calls. With detect_fists=False (scenes that
+    never use fists) no hand counts as a fist and fist_pos is all None.
+    """
+    def __init__(self, hands, width, height, pinch_threshold=40, detect_fists=True):
+        self.landmarks = hands
+        self.count = len(hands)
+        w, h = width, height
+        scale = np.array([w, h], dtype=np.float64)
+
+        # Pinch: integer pixel positions of thumb and index tips, like the cursor
+        tips = (hands[:, [THUMB_TIP, INDEX_TIP], :2] * scale).astype(np.int64)
+        p1, p2 = tips[:, 0], tips[:, 1]
+        center = (p1 + p2) // 2
+        length = np.hypot(*(p2 - p1).T)
+
+        self.pinch_length = length
+        self.p1 = [tuple(p) for p in p1.tolist()]
+        self.p2 = [tuple(p) for p in p2.tolist()]
+        self.cursors = [tuple(p) for p in center.tolist()]
+        self.is_pinching = (length < pinch_threshold).tolist()
+
+        if not detect_fists:
+            self.is_fist = [False] * self.count
+            self.fist_pos = [None] * self.count
+            return
+        # Fist: summed distance of the four finger tips to the wrist
+        pixels = hands[:, :, :2] * scale
+        spread = np.linalg.norm(pixels[:, FINGER_TIPS] - pixels[:, [WRIST]], axis=2).sum(axis=1)
+        fist_pos = (hands[:, MIDDLE_MCP, :2] * scale).astype(np.int64)
+        self.is_fist = (spread < h * 0.6).tolist()
+        self.fist_pos = [tuple(p) for p in fist_pos.tolist()]
+
+def draw_hand(img, landmarks):
+    """Draws one hand's skeleton the same way mediapipe's drawing_utils does by default."""
+    h, w = img.shape[:2]
+    xy = landmarks[:, :2]
+    visible = ((xy >= 0) & (xy <= 1)).all(axis=1)
+    px = np.minimum(np.floor(xy * (w, h)), (w - 1, h - 1)).astype(int).tolist()
+
+    for a, b in HAND_CONNECTIONS:
+        if visible[a] and visible[b]:
+            cv2.line(img, tuple(px[a]), tuple(px[b]), (224, 224, 224), 2)
+    for i, p in enumerate(px):
+        if visible[i]:
+            cv2.circle(img, tuple(p), 3, (224, 224, 224), 2)
+            cv2.circle(img, tuple(p), 2, (0, 0, 255), 2)
@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+from collections import deque
+import cv2
+from src.Gestures import landmarks_to_array
+
+class HandResult:
+    """Hand landmarks for one frame, tagged with the frame they were computed from."""
+    def __init__(self, frame, timestamp, frame_id, hands):
+        self.frame = frame              # flipped BGR frame the landmarks belong to
+        self.timestamp = timestamp      # capture time of that frame (perf_counter)
+        self.frame_id = frame_id
+        self.hands = hands              # (num_hands, 21, 3) normalized landmarks
+
+    def age(self, now=None):
+        """Seconds between capturing the source frame and `now`."""
+        if now is None: now = time.perf_counter()
+        return now - self.timestamp
+
+class HandTracker:
+    """Runs MediaPipe Hands on the calling thread.
+
+    Frames go in with submit() and come back as HandResult from collect(). The
+    synchronous tracker answers every frame right away; AsyncHandTracker uses the
+    same interface but keeps one frame in flight.
+
+    With inference_scale < 1 the frame is downscaled before it is handed to
+    MediaPipe. The whole frame is resized, so the normalized landmarks map back
+    onto the full-resolution frame unchanged and rendering stays at full size.
+    """
+    depth = 0
+
+    def __init__(self, max_num_hands=2, min_detection_confidence=0.7, inference_scale=1.0):
+        # Imported here so replays (ReplayHandTracker) work without MediaPipe installed
+        import mediapipe as mp
+        self.hands = mp.solutions.hands.Hands(max_num_hands=max_num_hands,
+                                              min_detection_confidence=min_detection_confidence)
+        self.inference_scale = inference_scale
+        self.results = deque()
+        self.in_flight = 0
+
+    def prepare(self, frame):
+        """Downscales (if configured) and converts a BGR frame to the RGB input MediaPipe expects."""
+        if self.inference_scale < 1.0:
+            h, w = frame.shape[:2]
+            size = (max(1, int(w * self.inference_scale)), max(1, int(h * self.inference_scale)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def infer(self, frame):
+        """Returns the landmarks of every detected hand as a (num_hands, 21, 3) array."""
+        return landmarks_to_array(self.hands.process(self.prepare(frame)).multi_hand_landmarks)
+
+    def _run(self, frame, timestamp, frame_id):
+        return HandResult(frame, timestamp, frame_id, self.infer(frame))
+
+    def submit(self, frame, timestamp, frame_id):
+        self.results.append(self._run(frame, timestamp, frame_id))
+        self.in_flight += 1
+
+    def collect(self):
+        """Returns the oldest finished result, or None while the pipeline is filling up."""
+        if self.in_flight <= self.depth:
+            return None
+        self.in_flight -= 1
+        return self.results.popleft()
+
+    def close(self):
+        self.hands.close()
+
+class AsyncHandTracker(HandTracker):
+    """Runs MediaPipe Hands on a worker thread, one frame ahead of the game loop.
+
+    submit() hands frame N+1 to the worker and collect() then waits for the result
+    of frame N, so inference of the next frame overlaps with simulating and drawing
+    the current one. Each result still carries its own frame, so landmarks are
+    always drawn on the image they were detected in. If inference fails, the
+    exception is passed to collect() and raised there, on the game loop's thread.
+    """
+    depth = 1
+
+    def __init__(self, max_num_hands=2, min_detection_confidence=0.7, inference_scale=1.0):
+        super().__init__(max_num_hands, min_detection_confidence, inference_scale)
+        self.requests = queue.Queue(maxsize=1)
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self._worker, name="hand-inference", daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        while True:
+            item = self.requests.get()
+            if item is None: break
+            try:
+                self.results.put(self._run(*item))
+            except Exception as exc:
+                self.results.put(exc)
+                break
+
+    def submit(self, frame, timestamp, frame_id):
+        self.requests.put((frame, timestamp, frame_id))
+        self.in_flight += 1
+
+    def collect(self):
+        if self.in_flight <= self.depth:
+            return None
+        self.in_flight -= 1
+        result = self.results.get()
+        if isinstance(result, Exception): raise result
+        return result
+
+    def close(self):
+        # The worker may be gone already (after an error), so don't wait on a full queue
+        try:
+            self.requests.put(None, timeout=1.0)
+        except queue.Full:
+            pass
+        self.thread.join(timeout=1.0)
+        # MediaPipe must not be closed while the worker may still be using it
+        if not self.thread.is_alive():
+            super().close()
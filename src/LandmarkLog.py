@@ -0,0 +1,108 @@
+import os
+import struct
+from collections import deque
+import numpy as np
+from src.HandTracking import HandTracker
+
+# ==========================================
+# LANDMARK LOG FILE FORMAT
+# ==========================================
+# 16 byte header (magic, version, record size, reserved) followed by fixed-size
+# records. Every recorded frame has at least one record; frames without hands
+# get a single record with hand == NO_HAND so replay stays frame-accurate.
+MAGIC = b"HLMK"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+NO_HAND = 255
+
+RECORD_DTYPE = np.dtype([
+    ("frame", "<u4"),               # index of the recorded frame
+    ("hand", "u1"),                 # hand index within the frame, NO_HAND if none
+    ("pad", "V3"),
+    ("timestamp", "<f8"),           # capture time of the source frame
+    ("landmarks", "<f4", (21, 3)),  # normalized x, y, z
+])
+
+class LandmarkRecorder:
+    """Appends the hand landmarks of every processed frame to a binary log."""
+    def __init__(self, path, flush_every=256):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, 0))
+        self.buffer = []
+        self.flush_every = flush_every
+        self.frame_index = 0
+
+    def write(self, timestamp, hands):
+        """Appends one frame; hands is a (num_hands, 21, 3) landmark array."""
+        records = np.zeros(max(1, len(hands)), dtype=RECORD_DTYPE)
+        records["frame"] = self.frame_index
+        records["timestamp"] = timestamp
+        if len(hands):
+            records["hand"] = np.arange(len(hands))
+            records["landmarks"] = hands
+        else:
+            records["hand"] = NO_HAND
+        self.buffer.append(records)
+        self.frame_index += 1
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(np.concatenate(self.buffer).tobytes())
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+class LandmarkReplay:
+    """Memory-mapped, read-only view of a landmark log."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, record_size, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Not a landmark log (or unsupported version): {path}")
+        if os.path.getsize(path) > HEADER.size:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size)
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        frames = self.records["frame"]
+        self.num_frames = int(frames[-1]) + 1 if len(frames) else 0
+        # Records are written in frame order, so each frame is one contiguous slice
+        self.starts = np.searchsorted(frames, np.arange(self.num_frames + 1))
+
+    def __len__(self):
+        return self.num_frames
+
+    def hands(self, frame_index):
+        """Returns the landmarks recorded for a frame as a (num_hands, 21, 3) array."""
+        rows = self.records[self.starts[frame_index]:self.starts[frame_index + 1]]
+        return np.array(rows["landmarks"][rows["hand"] != NO_HAND])
+
+    def timestamp(self, frame_index):
+        return float(self.records["timestamp"][self.starts[frame_index]])
+
+class ReplayHandTracker(HandTracker):
+    """Serves recorded landmarks instead of running MediaPipe.
+
+    The n-th submitted frame gets the hands of the n-th recorded frame, wrapping
+    around at the end of the log, so a run is fully deterministic regardless of
+    the frame source.
+    """
+    def __init__(self, path, loop=True):
+        self.log = LandmarkReplay(path)
+        if len(self.log) == 0:
+            raise ValueError(f"Landmark log is empty: {path}")
+        self.loop = loop
+        self.index = 0
+        self.results = deque()
+        self.in_flight = 0
+
+    def infer(self, frame):
+        index = self.index % len(self.log) if self.loop else min(self.index, len(self.log) - 1)
+        self.index += 1
+        return self.log.hands(index)
+
+    def close(self):
+        pass
@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+class Overlay:
+    """Translucent UI layer that is only blended where something was drawn.
+
+    Replaces `overlay = img.copy()` + a full-frame cv2.addWeighted. The frame is
+    split into tile x tile pixel tiles; a tile becomes dirty the first time
+    anything touches it, and only then is its frame content copied into the
+    layer. composite() blends just the dirty tiles, in horizontal runs.
+
+    For the result to match the full-frame blend pixel for pixel, the frame must
+    still hold its original content in a tile when the tile is first copied.
+    So everything drawn onto the frame before composite() has to protect() its
+    box first (text, sprites), and overlay shapes go through fill_rect().
+    """
+    def __init__(self, tile=16):
+        self.tile = tile
+        self.img = None
+        self.layer = None
+        self.dirty = None
+
+    def begin(self, img, full=False):
+        """Starts a new frame; img is the frame the layer will be blended onto.
+
+        full=True is for scenes that cover the whole frame anyway: everything is
+        copied and marked dirty at once, so drawing needs no tile bookkeeping.
+        """
+        if self.layer is None or self.layer.shape != img.shape:
+            h, w = img.shape[:2]
+            t = self.tile
+            self.layer = np.empty_like(img)
+            self.dirty = np.zeros(((h + t - 1) // t, (w + t - 1) // t), dtype=bool)
+        self.img = img
+        if full:
+            self.layer[:] = img
+            self.dirty[:] = True
+        else:
+            self.dirty[:] = False
+
+    def protect(self, x1, y1, x2, y2):
+        """Marks the pixel box (inclusive corners) dirty, copying the frame tiles it newly covers."""
+        t = self.tile
+        h, w = self.img.shape[:2]
+        tx0, ty0 = max(x1, 0) // t, max(y1, 0) // t
+        tx1, ty1 = min(x2, w - 1) // t + 1, min(y2, h - 1) // t + 1
+        if tx0 >= tx1 or ty0 >= ty1: return
+        block = self.dirty[ty0:ty1, tx0:tx1]
+        if block.all(): return
+        if not block.any():
+            self.layer[ty0*t:ty1*t, tx0*t:tx1*t] = self.img[ty0*t:ty1*t, tx0*t:tx1*t]
+        else:
+            for ty, tx in zip(*np.nonzero(~block)):
+                ys = slice((ty0 + ty) * t, (ty0 + ty + 1) * t)
+                xs = slice((tx0 + tx) * t, (tx0 + tx + 1) * t)
+                self.layer[ys, xs] = self.img[ys, xs]
+        block[:] = True
+
+    def protect_text(self, text, org, font, scale, thickness):
+        """protect() for the box cv2.putText will draw the text into."""
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        x, y = org
+        pad = thickness + 1
+        self.protect(x - pad, y - h - pad, x + w + pad, y + baseline + pad)
+
+    def fill_rect(self, p1, p2, color):
+        """Filled rectangle on the layer, like cv2.rectangle(overlay, p1, p2, color, -1)."""
+        self.protect(min(p1[0], p2[0]), min(p1[1], p2[1]), max(p1[0], p2[0]), max(p1[1], p2[1]))
+        cv2.rectangle(self.layer, p1, p2, color, -1)
+
+    def paste(self, origin, pixels, mask):
+        """Copies masked pixels (e.g. a cached UILayer) into the layer at origin."""
+        x, y = origin
+        self.protect(x, y, x + pixels.shape[1] - 1, y + pixels.shape[0] - 1)
+        h, w = self.layer.shape[:2]
+        sx, sy = max(0, -x), max(0, -y)
+        ex, ey = min(pixels.shape[1], w - x), min(pixels.shape[0], h - y)
+        if sx >= ex or sy >= ey: return
+        cv2.copyTo(pixels[sy:ey, sx:ex], mask[sy:ey, sx:ex], self.layer[y + sy:y + ey, x + sx:x + ex])
+
+    def composite(self, alpha):
+        """Blends the layer onto the frame with weight alpha, dirty tiles only."""
+        t = self.tile
+        img, layer, dirty = self.img, self.layer, self.dirty
+        # Consecutive tile rows with the same dirty columns are blended as one band
+        changes = np.flatnonzero((dirty[1:] != dirty[:-1]).any(axis=1)) + 1
+        bounds = [0] + changes.tolist() + [dirty.shape[0]]
+        for top, bottom in zip(bounds[:-1], bounds[1:]):
+            row = dirty[top]
+            if not row.any(): continue
+            edges = np.flatnonzero(np.diff(row.astype(np.int8), prepend=0, append=0)).tolist()
+            ys = slice(top * t, bottom * t)
+            for start, end in zip(edges[::2], edges[1::2]):
+                xs = slice(start * t, end * t)
+                cv2.addWeighted(layer[ys, xs], alpha, img[ys, xs], 1 - alpha, 0, img[ys, xs])
+
+    def dirty_fraction(self):
+        return float(self.dirty.mean()) if self.dirty is not None else 0.0
+
+def fill_rect(layer, p1, p2, color):
+    """Filled rectangle on an overlay, which may be an Overlay or a plain image."""
+    if isinstance(layer, Overlay):
+        layer.fill_rect(p1, p2, color)
+    else:
+        cv2.rectangle(layer, p1, p2, color, -1)
@@ -0,0 +1,102 @@
+import time
+import cv2
+import numpy as np
+
+class FrameProfiler:
+    """Per-stage timings of the main loop, with rolling percentiles.
+
+    Call start() at the top of a frame and lap(stage) at the end of every stage;
+    each lap records the time since the previous one. The last `window` samples
+    of every stage are kept in ring buffers, so p50/p95/p99 follow the recent
+    frames rather than the whole run. A stage lapped twice in one frame adds up
+    into a single sample. While disabled, start() and lap() return immediately.
+
+    With a tracer (src/Tracing.py) every lap is also written as a span, and
+    finish() writes the whole frame, whether or not the HUD is enabled.
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, enabled=False, window=240, refresh=15, tracer=None):
+        self.enabled = enabled
+        self.tracer = tracer
+        self.window = window
+        self.refresh = refresh  # frames between HUD percentile updates
+        self.samples = {}       # stage -> ring buffer of milliseconds
+        self.counts = {}        # stage -> samples written so far
+        self.seen = {}          # stage -> frame it was last lapped in
+        self.frames = 0
+        self.last = 0.0
+        self.frame_start = 0.0
+        self.hud_lines = []
+        self.hud_width = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.samples.clear()
+            self.counts.clear()
+            self.seen.clear()
+            self.hud_lines = []
+            self.last = time.perf_counter()
+
+    def start(self):
+        if not self.enabled and self.tracer is None: return
+        self.frames += 1
+        self.last = self.frame_start = time.perf_counter()
+
+    def lap(self, stage):
+        if not self.enabled and self.tracer is None: return
+        now = time.perf_counter()
+        if self.tracer is not None:
+            self.tracer.span(stage, self.last, now)
+        if not self.enabled:
+            self.last = now
+            return
+        buf = self.samples.get(stage)
+        if buf is None:
+            buf = self.samples[stage] = np.zeros(self.window)
+            self.counts[stage] = 0
+        n = self.counts[stage]
+        ms = (now - self.last) * 1000
+        if self.seen.get(stage) == self.frames:
+            buf[(n - 1) % self.window] += ms
+        else:
+            buf[n % self.window] = ms
+            self.counts[stage] = n + 1
+            self.seen[stage] = self.frames
+        self.last = now
+
+    def finish(self, **args):
+        """Ends the frame; only needed for tracing (args end up on the frame span)."""
+        if self.tracer is not None:
+            self.tracer.span("frame", self.frame_start, time.perf_counter(), cat="frame", args=args)
+
+    def stats(self):
+        """{stage: (p50, p95, p99)} in milliseconds over the current window."""
+        result = {}
+        for stage, buf in self.samples.items():
+            n = min(self.counts[stage], self.window)
+            result[stage] = tuple(np.percentile(buf[:n], self.PERCENTILES))
+        return result
+
+    def report(self):
+        """The stats as lines of text, slowest median first."""
+        stats = sorted(self.stats().items(), key=lambda item: -item[1][0])
+        width = max([10] + [len(stage) for stage, _ in stats])
+        lines = [f"{'stage':<{width}} {'p50':>6} {'p95':>6} {'p99':>6}"]
+        for stage, (p50, p95, p99) in stats:
+            lines.append(f"{stage:<{width}} {p50:>6.2f} {p95:>6.2f} {p99:>6.2f}")
+        return lines
+
+    def draw(self, img):
+        """Draws the HUD in the lower left corner of img (percentiles refresh every few frames)."""
+        if not self.enabled: return
+        if not self.hud_lines or self.frames % self.refresh == 0:
+            self.hud_lines = self.report()
+            # Stage names differ per scene, so the box grows with the longest line
+            self.hud_width = max(cv2.getTextSize(line, cv2.FONT_HERSHEY_PLAIN, 1.0, 1)[0][0] for line in self.hud_lines)
+        line_h = 18
+        x, y = 10, img.shape[0] - 10 - line_h * len(self.hud_lines)
+        cv2.rectangle(img, (x - 5, y - line_h), (x + max(250, self.hud_width + 10), img.shape[0] - 5), (0, 0, 0), -1)
+        for i, line in enumerate(self.hud_lines):
+            cv2.putText(img, line, (x, y + i * line_h), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 0), 1)
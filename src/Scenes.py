@@ -0,0 +1,396 @@
+import cv2
+from src.Components import UILayer
+from src.Enemies import BOSS
+
+class FrameInput:
+    """One frame as a scene sees it: the image, the overlay and the hand input.
+
+    hovered holds the button under every cursor and clicked the button under
+    every new pinch (None where there is none), both resolved once against the
+    scene's UILayer before update() runs.
+    """
+    def __init__(self, img, overlay, cursors, clicks, fists, hovered, clicked):
+        self.img = img
+        self.overlay = overlay
+        self.cursors = cursors
+        self.clicks = clicks
+        self.fists = fists
+        self.hovered = hovered
+        self.clicked = clicked
+
+class Scene:
+    """One state of the game: its buttons, its rules and what it draws.
+
+    Every frame HandGame calls update() (clicks and game rules; may switch
+    game.state), then draw_overlay() (the translucent layer and anything drawn
+    onto the frame before it is blended), then draw_sprites() if the scene has
+    any (timed as its own profiler stage), then draw_text() (on top of the
+    blended frame). All of them run on the scene the frame started in. enter()
+    runs on the first frame after switching to the scene.
+
+    The class attributes tell the loop what the scene uses, so it can skip the
+    rest: needs_fists (fist detection), has_sprites (draw_sprites() runs),
+    full_overlay (the overlay covers the whole frame, so it is copied in one go
+    instead of tile by tile) and alpha (the overlay's blend weight).
+    """
+    name = None
+    needs_fists = False
+    has_sprites = False
+    full_overlay = False
+    alpha = 0.3
+
+    def __init__(self, game):
+        self.game = game
+        self.layer = self.make_layer()
+
+    def buttons(self):
+        return []
+
+    def make_layer(self):
+        return UILayer(self.buttons())
+
+    def ui_layer(self):
+        """The cached button layer clicks and hovers are resolved against."""
+        return self.layer
+
+    def enter(self):
+        pass
+
+    def update(self, frame):
+        pass
+
+    def draw_overlay(self, frame):
+        self.ui_layer().draw_on_overlay(frame.overlay, frame.hovered)
+
+    def draw_sprites(self, frame):
+        pass
+
+    def draw_text(self, frame):
+        self.ui_layer().draw_text_and_border(frame.img)
+
+class LoginScene(Scene):
+    name = "LOGIN"
+
+    def make_layer(self):
+        return self.game.keyboard.ui_layer([self.game.btn_skip])
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            res = game.keyboard.press(btn)
+            if res == "ENTER_PRESSED":
+                game.next_state_after_confirm = "LOGIN_SUCCESS"
+                game.state = "CONFIRM_ACTION"
+            if btn is game.btn_skip:
+                game.current_user = "Guest"
+                game.is_guest = True
+                game.state = "MENU"
+
+    def draw_overlay(self, frame):
+        game = self.game
+        game.put_text(frame.img, "PLEASE ENTER NAME", (int(game.width*0.3), int(game.height*0.10)), 1, (0,0,0), 2)
+        super().draw_overlay(frame)
+
+    def draw_text(self, frame):
+        super().draw_text(frame)
+        self.game.keyboard.draw_input(frame.img)
+
+class AddUserScene(Scene):
+    name = "ADD_USER_INPUT"
+
+    def make_layer(self):
+        return self.game.keyboard.ui_layer([self.game.btn_back_to_record_kb])
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            res = game.keyboard.press(btn)
+            if res == "ENTER_PRESSED":
+                game.next_state_after_confirm = "ADD_SUCCESS"
+                game.state = "CONFIRM_ACTION"
+            if btn is game.btn_back_to_record_kb:
+                game.state = "RECORDS"
+
+    def draw_overlay(self, frame):
+        game = self.game
+        game.put_text(frame.img, "CREATE NEW USER", (int(game.width*0.3), int(game.height*0.15)), 1, (0,0,0), 2)
+        super().draw_overlay(frame)
+
+    def draw_text(self, frame):
+        super().draw_text(frame)
+        self.game.keyboard.draw_input(frame.img)
+
+class ConfirmActionScene(Scene):
+    name = "CONFIRM_ACTION"
+
+    def buttons(self):
+        return [self.game.btn_confirm_yes, self.game.btn_confirm_no]
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_confirm_yes:
+                game.current_user = game.keyboard.input_text
+                game.is_guest = False
+                game.db.register_user(game.current_user)
+                if game.next_state_after_confirm == "LOGIN_SUCCESS": game.state = "MENU"
+                elif game.next_state_after_confirm == "ADD_SUCCESS": game.state = "RECORDS"
+            elif btn is game.btn_confirm_no:
+                if game.next_state_after_confirm == "LOGIN_SUCCESS": game.state = "LOGIN"
+                elif game.next_state_after_confirm == "ADD_SUCCESS": game.state = "ADD_USER_INPUT"
+
+    def draw_overlay(self, frame):
+        game = self.game
+        box_x1, box_x2 = int(game.width * 0.25), int(game.width * 0.75)
+        box_y1, box_y2 = int(game.height * 0.3), int(game.height * 0.7)
+        frame.overlay.fill_rect((box_x1, box_y1), (box_x2, box_y2), (255, 255, 255))
+        game.put_text(frame.img, f"Confirm: '{game.keyboard.input_text}'?", (box_x1 + 20, box_y1 + 50), 1, (0,0,0), 2)
+        super().draw_overlay(frame)
+
+class ConfirmDeleteScene(Scene):
+    name = "CONFIRM_DELETE"
+
+    def buttons(self):
+        return [self.game.btn_delete_yes, self.game.btn_delete_no]
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_delete_yes:
+                game.db.delete_user(game.current_user)
+                game.keyboard.input_text = ""
+                game.state = "LOGIN"
+            elif btn is game.btn_delete_no:
+                game.state = "RECORDS"
+
+    def draw_overlay(self, frame):
+        game = self.game
+        box_x1, box_x2 = int(game.width * 0.2), int(game.width * 0.8)
+        box_y1, box_y2 = int(game.height * 0.3), int(game.height * 0.7)
+        frame.overlay.fill_rect((box_x1, box_y1), (box_x2, box_y2), (200, 200, 255))
+        game.put_text(frame.img, "ARE YOU SURE?", (box_x1 + 50, box_y1 + 50), 1.2, (0,0,0), 2)
+        super().draw_overlay(frame)
+
+class MenuScene(Scene):
+    name = "MENU"
+
+    def buttons(self):
+        return [self.game.btn_start, self.game.btn_records, self.game.btn_exit]
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_start: game.state = "DIFFICULTY"
+            elif btn is game.btn_records: game.state = "RECORDS"
+            elif btn is game.btn_exit: game.running = False
+
+    def draw_overlay(self, frame):
+        game = self.game
+        display_name = "Guest" if game.is_guest else game.current_user
+        game.put_text(frame.img, f"Welcome, {display_name}", (int(game.width*0.05), int(game.height*0.1)), 1, (0,0,0), 2)
+        super().draw_overlay(frame)
+
+class DifficultyScene(Scene):
+    name = "DIFFICULTY"
+
+    def buttons(self):
+        game = self.game
+        return [game.btn_easy, game.btn_med, game.btn_hard, game.btn_back, game.btn_special_toggle]
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_easy:
+                game.start_game("EASY")
+            elif btn is game.btn_med:
+                game.start_game("NORMAL")
+            elif btn is game.btn_hard:
+                game.start_game("HARD")
+            elif btn is game.btn_back:
+                game.state = "MENU"
+            elif btn is game.btn_special_toggle:
+                game.enable_special_enemies = not game.enable_special_enemies
+
+    def draw_overlay(self, frame):
+        game = self.game
+        game.put_text(frame.img, "SELECT DIFFICULTY", (int(game.width * 0.35), int(game.height*0.2)), 1.2, (0,0,0), 2)
+        # Changing the toggle's text or color makes the layer rebuild itself
+        game.btn_special_toggle.text = f"SPECIAL: {'ON' if game.enable_special_enemies else 'OFF'}"
+        game.btn_special_toggle.color = (150, 255, 150) if game.enable_special_enemies else (200, 200, 200)
+        super().draw_overlay(frame)
+
+class PlayingScene(Scene):
+    name = "PLAYING"
+    needs_fists = True
+    has_sprites = True
+
+    def buttons(self):
+        return [self.game.btn_pause]
+
+    def enter(self):
+        # Don't catch up on time spent outside the game (menus, pause)
+        self.game.sim.clock.reset()
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_pause:
+                game.state = "PAUSED"
+
+        for event in game.sim.update(frame.clicks, frame.fists):
+            if game.tracer:
+                game.trace_event(event)
+            if event[0] == "SPAWN" and event[1] == BOSS:
+                print("DEBUG: BOSS SPAWNED!")
+            elif event[0] == "EVOLVED":
+                # [NEW] Boss Transformation Logic
+                game.assets.evolve()
+                print("BOSS DEFEATED! SHIP EVOLVED!")
+            elif event[0] == "GAME_OVER":
+                game.state = "GAME_OVER"
+                if not game.is_guest:
+                    game.db.add_score(game.current_user, game.score, game.current_difficulty)
+
+    def draw_overlay(self, frame):
+        game, img = self.game, frame.img
+        game.put_text(img, f"Score: {game.score}", (50, 50), 1.2, (255, 255, 0), 2)
+        game.put_text(img, f"Diff: {game.current_difficulty}", (50, 90), 0.8, (200, 200, 200), 2)
+        if game.is_guest:
+            game.put_text(img, "GUEST MODE", (50, 130), 0.6, (100, 100, 255), 2)
+        super().draw_overlay(frame)
+
+    def draw_sprites(self, frame):
+        game, img = self.game, frame.img
+        # [NEW] Draw Current Player Ship (Default or Evolved)
+        cx, cy = game.center
+        frame.overlay.protect(cx - 40, cy - 40, cx + 40, cy + 40)
+        if game.assets.ship is not None:
+            game.draw_image_centered(img, game.assets.ship, cx, cy, 80)
+        else:
+            cv2.circle(img, game.center, 30, (0, 255, 0), -1)
+        game.draw_enemies(img)
+
+class PausedScene(Scene):
+    name = "PAUSED"
+    alpha = 0.4
+
+    def buttons(self):
+        return [self.game.btn_resume, self.game.btn_restart, self.game.btn_save_quit]
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_resume: game.state = "PLAYING"
+            elif btn is game.btn_restart:
+                game.start_game(game.current_difficulty)
+            elif btn is game.btn_save_quit:
+                if not game.is_guest: game.db.add_score(game.current_user, game.score, game.current_difficulty)
+                game.state = "MENU"
+
+    def draw_overlay(self, frame):
+        game = self.game
+        bx1, bx2 = int(game.width*0.3), int(game.width*0.7)
+        by1, by2 = int(game.height*0.2), int(game.height*0.8)
+        frame.overlay.fill_rect((bx1, by1), (bx2, by2), (200, 200, 200))
+        game.put_text(frame.img, "PAUSED", (bx1 + 100, by1 + 80), 1.5, (0,0,0), 3)
+        super().draw_overlay(frame)
+
+class GameOverScene(Scene):
+    name = "GAME_OVER"
+    full_overlay = True
+    alpha = 0.6
+
+    def buttons(self):
+        return [self.game.btn_back]
+
+    def enter(self):
+        self.game.assets.reset()
+
+    def update(self, frame):
+        for btn in frame.clicked:
+            if btn is self.game.btn_back: self.game.state = "MENU"
+
+    def draw_overlay(self, frame):
+        game = self.game
+        frame.overlay.fill_rect((0,0), (game.width, game.height), (0,0,0))
+        game.put_text(frame.img, "GAME OVER", (int(game.width*0.35), int(game.height*0.4)), 2, (0, 0, 255), 4)
+        game.put_text(frame.img, f"Final Score: {game.score}", (int(game.width*0.4), int(game.height*0.5)), 1, (255, 255, 255), 2)
+        super().draw_overlay(frame)
+
+class RecordsScene(Scene):
+    name = "RECORDS"
+
+    def buttons(self):
+        game = self.game
+        return [game.btn_back_rec, game.btn_delete_user, game.btn_switch_user, game.btn_add_user]
+
+    def make_layer(self):
+        # Guests have no records to delete, so they get the layer without that button
+        game = self.game
+        self.guest_layer = UILayer([game.btn_back_rec, game.btn_switch_user, game.btn_add_user])
+        return super().make_layer()
+
+    def ui_layer(self):
+        return self.guest_layer if self.game.is_guest else self.layer
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_back_rec: game.state = "MENU"
+            elif not game.is_guest and btn is game.btn_delete_user: game.state = "CONFIRM_DELETE"
+            elif btn is game.btn_switch_user:
+                game.state = "SWITCH_USER_SELECT"
+            elif btn is game.btn_add_user:
+                game.keyboard.input_text = ""
+                game.state = "ADD_USER_INPUT"
+
+    def draw_overlay(self, frame):
+        game, img = self.game, frame.img
+        frame.overlay.fill_rect((100, 100), (game.width - 100, game.height - 50), (240, 240, 240))
+        game.put_text(img, "PLAYER RECORDS", (int(game.width*0.35), 120), 1.2, (50, 50, 50), 3)
+        if game.is_guest:
+            game.put_text(img, "Guest User - No Records", (int(game.width*0.3), 300), 1, (100,100,100), 2)
+        else:
+            user_data = game.db.data.get(game.current_user, {})
+            y_offset = 200
+            game.put_text(img, f"User: {game.current_user}", (150, y_offset), 1, (0,0,0), 2)
+            y_offset += 50
+            for diff in ["EASY", "NORMAL", "HARD"]:
+                d_data = user_data.get(diff, {"best_score": 0, "history": []})
+                text = f"{diff} - Best: {d_data['best_score']} | Games: {len(d_data['history'])}"
+                game.put_text(img, text, (150, y_offset), 0.7, (0,100,0), 2)
+                y_offset += 40
+        super().draw_overlay(frame)
+
+class SwitchUserScene(Scene):
+    name = "SWITCH_USER_SELECT"
+
+    def buttons(self):
+        return self.game.user_buttons + [self.game.btn_back_from_switch]
+
+    def enter(self):
+        # The user list may have changed since the last visit
+        self.game.refresh_user_buttons()
+        self.layer = self.make_layer()
+
+    def update(self, frame):
+        game = self.game
+        for btn in frame.clicked:
+            if btn is game.btn_back_from_switch: game.state = "RECORDS"
+            elif btn is not None:
+                # Any other button of this scene is one of the user buttons
+                game.current_user = btn.text
+                game.is_guest = False
+                game.state = "MENU"
+
+    def draw_overlay(self, frame):
+        game = self.game
+        frame.overlay.fill_rect((50, 50), (game.width-50, game.height-50), (240, 240, 240))
+        game.put_text(frame.img, "SELECT USER", (int(game.width*0.4), 100), 1.5, (0,0,0), 3)
+        super().draw_overlay(frame)
+
+# Dispatch table: game state -> scene class
+SCENES = {scene.name: scene for scene in [
+    LoginScene, AddUserScene, ConfirmActionScene, ConfirmDeleteScene, MenuScene, DifficultyScene,
+    PlayingScene, PausedScene, GameOverScene, RecordsScene, SwitchUserScene,
+]}
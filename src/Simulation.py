@@ -0,0 +1,157 @@
+import math
+import random
+from src.Clock import FixedStepClock
+from src.Enemies import EnemyStore, CIRCLE, SQUARE, BOSS
+
+DIFFICULTY_SETTINGS = {
+    "EASY": {"spawn_rate": 1.5, "speed_base": 2, "speed_mult": 0.05},
+    "NORMAL": {"spawn_rate": 1.0, "speed_base": 4, "speed_mult": 0.1},
+    "HARD": {"spawn_rate": 0.6, "speed_base": 6, "speed_mult": 0.2},
+}
+# Chance that a non-boss enemy is a fist-only square, when special enemies are on
+SQUARE_CHANCE = {"EASY": 0.1, "NORMAL": 0.3, "HARD": 0.5}
+# Points for destroying each kind
+POINTS = {CIRCLE: 1, SQUARE: 2, BOSS: 10}
+
+class GameSimulation:
+    """The rules of one game round, without any camera, model or window.
+
+    update() takes the pinch clicks and fist positions of a frame (screen
+    pixels) plus the frame time, runs the fixed simulation ticks and returns what
+    happened as a list of event tuples:
+
+        ("SPAWN", kind)          an enemy entered the screen
+        ("HIT", kind, points)    an enemy was destroyed by a pinch or fist
+        ("EVOLVED",)             a boss was punched, the ship evolves
+        ("GAME_OVER", score)     an enemy reached the ship
+
+    Nothing here draws. Enemies carry an icon variant index into the icon set
+    of their kind; icon_counts gives the size of each set as
+    {(kind, evolved): count} so the renderer can map variants to images.
+    rng defaults to the random module, so random.seed() makes rounds repeatable.
+    With can_evolve=False (no evolved ship image) punching a boss still reports
+    EVOLVED, but enemies keep spawning with their normal icons.
+    """
+    def __init__(self, width, height, icon_counts=None, rng=None, tick_rate=30.0, lockstep=False, can_evolve=True):
+        self.width = width
+        self.height = height
+        self.center = (width // 2, height // 2)
+        self.icon_counts = icon_counts or {}
+        self.can_evolve = can_evolve
+        self.rng = rng if rng is not None else random
+        # Enemies move and spawn in fixed 30 Hz ticks (the webcam rate the speeds were tuned for),
+        # independent of how fast frames are rendered
+        self.clock = FixedStepClock(tick_rate=tick_rate, lockstep=lockstep)
+        # Grid cells about one boss reach (radius + fist margin) wide
+        self.enemies = EnemyStore(cell_size=int(width * 0.04) + 40)
+        self.tick = 0
+        self.special_enemies = False
+        self.start("NORMAL")
+        self.over = True  # nothing is played until start() is called
+
+    def set_difficulty(self, level):
+        self.difficulty = level
+        self.settings = DIFFICULTY_SETTINGS[level]
+        self.spawn_interval = self.settings["spawn_rate"]
+
+    def start(self, level, special_enemies=None):
+        """Starts a fresh round on the given difficulty."""
+        self.set_difficulty(level)
+        if special_enemies is not None:
+            self.special_enemies = special_enemies
+        self.enemies.clear()
+        self.score = 0
+        self.spawn_timer = 0.0
+        self.evolved = False
+        self.over = False
+        self.clock.reset()
+
+    def pick_variant(self, kind, evolved):
+        count = self.icon_counts.get((kind, evolved), 0)
+        if not count: return -1
+        if kind == BOSS: return 0  # the boss has a single icon
+        return self.rng.randrange(count)
+
+    def spawn_enemy(self):
+        rng = self.rng
+        side = rng.choice(['top', 'bottom', 'left', 'right'])
+        if side == 'top': x, y = rng.randint(0, self.width), 0
+        elif side == 'bottom': x, y = rng.randint(0, self.width), self.height
+        elif side == 'left': x, y = 0, rng.randint(0, self.height)
+        else: x, y = self.width, rng.randint(0, self.height)
+
+        angle = math.atan2(self.center[1] - y, self.center[0] - x)
+        speed = self.settings["speed_base"] + (self.score * self.settings["speed_mult"])
+
+        vx, vy = math.cos(angle) * speed, math.sin(angle) * speed
+
+        # Straight line at constant speed: the tick it gets within 40px of the ship is known now.
+        # It takes its first step in the current tick, so it is there after floor((d - 40) / speed) + 1
+        # steps. That is exact only in real arithmetic: when it lands right on 40px the rounded
+        # position decides, so check the neighbouring steps with the positions step() will produce.
+        cx, cy = self.center
+        def inside(steps):
+            px, py = EnemyStore.position(x, y, vx, vy, steps)
+            return math.hypot(cx - px, cy - py) < 40
+        distance = math.hypot(cx - x, cy - y)
+        steps = max(1, math.floor((distance - 40) / speed) + 1)
+        if steps > 1 and inside(steps - 1): steps -= 1
+        elif not inside(steps) and inside(steps + 1): steps += 1
+        impact_tick = self.tick + steps - 1
+
+        # Boss: Normal/Hard only, when the score is a power of two, more likely the higher it is
+        kind = CIRCLE
+        if self.difficulty in ("NORMAL", "HARD") and (self.score & (self.score - 1)) == 0:
+            chance = math.log2(self.score) / 50 if self.score else 0.0
+            if rng.random() < chance:
+                kind = BOSS
+        if kind != BOSS and self.special_enemies and rng.random() < SQUARE_CHANCE[self.difficulty]:
+            kind = SQUARE
+        variant = self.pick_variant(kind, self.evolved)
+
+        self.enemies.add(x, y, vx, vy,
+                         int(self.width * 0.04) if kind == BOSS else int(self.width * 0.035),
+                         kind, variant, self.evolved, impact_tick)
+        return kind
+
+    def update(self, clicks, fists, dt=None):
+        """Advances the round by one frame of dt seconds (real time if None) and returns its events."""
+        events = []
+        if self.over:
+            return events
+        enemies = self.enemies
+        ticks = self.clock.advance(dt)
+        reached_ship = False
+        for tick in range(ticks):
+            self.tick += 1
+            self.spawn_timer += self.clock.dt
+            if self.spawn_timer > self.spawn_interval:
+                events.append(("SPAWN", self.spawn_enemy()))
+                self.spawn_timer = 0.0
+            enemies.step()
+            if tick < ticks - 1 and enemies.next_impact() <= self.tick:
+                reached_ship = True
+                break
+
+        # Pointers are applied once per frame, after the ticks.
+        # 1. Circle Enemy -> Pinch, 2. Square/Boss Enemy -> Fist
+        # Swept test: everything an enemy passed through since the last frame counts
+        if (clicks or fists) and enemies.count:
+            kind = enemies.kind
+            pinched = enemies.hits(clicks, 30, kind == CIRCLE)
+            punched = enemies.hits(fists, 40, kind != CIRCLE)
+            destroyed = pinched | punched
+            if destroyed.any():
+                for k in kind[destroyed].tolist():
+                    self.score += POINTS[k]
+                    events.append(("HIT", k, POINTS[k]))
+                if (punched & (kind == BOSS)).any():
+                    if self.can_evolve: self.evolved = True
+                    events.append(("EVOLVED",))
+                enemies.remove(destroyed)
+        enemies.end_sweep()
+
+        if reached_ship or enemies.next_impact() <= self.tick:
+            self.over = True
+            events.append(("GAME_OVER", self.score))
+        return events
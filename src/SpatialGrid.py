@@ -0,0 +1,36 @@
+import math
+import numpy as np
+
+class SpatialHash:
+    """Uniform grid index over a set of points, rebuilt from scratch each tick.
+
+    rebuild() sorts the point indices by cell key, so every occupied cell is one
+    contiguous run of `order`; query() binary-searches the runs of the cells
+    overlapping the search box instead of looking at every point.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = float(cell_size)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64)
+
+    def rebuild(self, x, y):
+        cx = np.floor(x / self.cell_size).astype(np.int64)
+        cy = np.floor(y / self.cell_size).astype(np.int64)
+        # One int64 key per cell; cell coordinates stay far below 2**31 on any screen
+        keys = (cx << 32) + cy
+        self.order = np.argsort(keys)
+        self.keys = keys[self.order]
+
+    def query(self, px, py, radius):
+        """Indices of the points in all cells overlapping the square around (px, py)."""
+        size = self.cell_size
+        x0, x1 = math.floor((px - radius) / size), math.floor((px + radius) / size)
+        y0, y1 = math.floor((py - radius) / size), math.floor((py + radius) / size)
+        # Cells of one column are consecutive keys, so each column is a single run
+        cols = np.arange(x0, x1 + 1, dtype=np.int64) << 32
+        starts = np.searchsorted(self.keys, cols + y0, side="left")
+        ends = np.searchsorted(self.keys, cols + y1, side="right")
+        chunks = [self.order[s:e] for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
+        if not chunks:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
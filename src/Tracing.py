@@ -0,0 +1,84 @@
+import csv
+import json
+import time
+
+class Tracer:
+    """Writes timing spans and game events to a Chrome trace or a CSV file.
+
+    The format follows the file extension: .json is the Chrome trace-event
+    format (open it in chrome://tracing or https://ui.perfetto.dev), anything
+    else is CSV. Spans are (name, start, end) in perf_counter seconds; instant
+    events mark a single moment. Records are buffered in memory and written
+    every buffer_size records, so tracing a frame costs a few list appends.
+
+    Every category gets its own track (frames and stages, game states, game
+    events, disk I/O), so a slow frame lines up with what happened around it.
+    """
+    TRACKS = {"frame": 1, "stage": 1, "state": 2, "event": 3, "io": 4}
+    TRACK_NAMES = {1: "frames", 2: "game state", 3: "game events", 4: "disk"}
+
+    def __init__(self, path, buffer_size=4096):
+        self.path = path
+        self.chrome = path.lower().endswith(".json")
+        self.buffer = []
+        self.buffer_size = buffer_size
+        self.origin = time.perf_counter()
+        self.state = None
+        self.state_start = 0.0
+        self.file = open(path, "w", newline="")
+        if self.chrome:
+            self.file.write("[\n")
+            self.first = True
+            for tid, name in self.TRACK_NAMES.items():
+                self.buffer.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}})
+        else:
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(["type", "name", "category", "start_ms", "duration_ms", "args"])
+
+    def span(self, name, start, end, cat="stage", args=None):
+        """Something that took from start to end (perf_counter seconds)."""
+        self.buffer.append(("X", name, cat, start, end - start, args))
+        if len(self.buffer) >= self.buffer_size: self.flush()
+
+    def instant(self, name, cat="event", args=None, ts=None):
+        """Something that happened at ts (now if None)."""
+        if ts is None: ts = time.perf_counter()
+        self.buffer.append(("i", name, cat, ts, 0.0, args))
+        if len(self.buffer) >= self.buffer_size: self.flush()
+
+    def mark_state(self, state, ts=None):
+        """Called every frame with the game state; emits one span per stretch of the same state."""
+        if state == self.state: return
+        if ts is None: ts = time.perf_counter()
+        if self.state is not None:
+            self.span(self.state, self.state_start, ts, cat="state")
+        self.state, self.state_start = state, ts
+
+    def flush(self):
+        if self.chrome:
+            lines = []
+            for record in self.buffer:
+                if isinstance(record, tuple):
+                    ph, name, cat, start, duration, args = record
+                    record = {"name": name, "cat": cat, "ph": ph, "pid": 1, "tid": self.TRACKS.get(cat, 3),
+                              "ts": round((start - self.origin) * 1e6, 1)}
+                    if ph == "X": record["dur"] = round(duration * 1e6, 1)
+                    else: record["s"] = "t"
+                    if args: record["args"] = args
+                lines.append(json.dumps(record))
+            if lines:
+                self.file.write(("" if self.first else ",\n") + ",\n".join(lines))
+                self.first = False
+        else:
+            self.writer.writerows(
+                (ph, name, cat, f"{(start - self.origin) * 1000:.3f}", f"{duration * 1000:.3f}",
+                 json.dumps(args) if args else "")
+                for ph, name, cat, start, duration, args in self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        if self.file.closed: return
+        self.mark_state(None)
+        self.flush()
+        if self.chrome: self.file.write("\n]\n")
+        self.file.close()